@@ -1,5 +1,8 @@
 import pygame
 
+import assets
+from engine import Rect, masks_overlap
+
 """
 The enemies in a much harder version of flappy bird.
 
@@ -10,7 +13,13 @@ class Enemy:
     """
     Represents a single enemy.
     """
-    IMAGE = pygame.image.load("resources/images/ghost.png").convert_alpha()
+    __slots__ = ("x", "y", "dead")
+
+    IMAGE = "ghost"
+    # Collide pixel by pixel instead of with the whole rectangle, flappybird.py sets it from PIXEL_COLLISIONS.
+    PIXEL_COLLISIONS = False
+    # Mask for pixel collisions, made the first time it is needed.
+    MASK = None
     WIDTH = 32
     HEIGHT = 32
     SPEED = 2
@@ -18,48 +27,66 @@ class Enemy:
     def __init__(self, x, y):
         self.x = x
         self.y = y
-        self.surface = pygame.Surface((Enemy.WIDTH, Enemy.HEIGHT), pygame.SRCALPHA)
         self.dead = False
 
     def update(self):
         self.x -= Enemy.SPEED
 
     def draw(self, gamescreen):
-        self.surface.fill(0)
-        self.surface.blit(Enemy.IMAGE, (0, 0))
-        gamescreen.blit(self.surface, (self.x, self.y))
+        gamescreen.blit(assets.get(Enemy.IMAGE), (self.x, self.y))
 
     def is_visible(self):
         return self.x > 0
 
     def get_rect(self):
         """
-        Get the screen rectangle around the enemy.
+        Get the screen rectangle around the enemy, the ghost image is opaque right to its edges.
         :return: Rectangle with game screen position.
         """
-        return self.surface.get_bounding_rect().move(self.x, self.y)
+        return Rect(int(self.x), int(self.y), Enemy.WIDTH, Enemy.HEIGHT)
+
+    def get_mask(self):
+        """
+        Get the mask for pixel collisions.
+        :return: The mask lined up with get_rect(), None to collide with the whole rectangle.
+        """
+        if not Enemy.PIXEL_COLLISIONS:
+            return None
+        if Enemy.MASK is None:
+            Enemy.MASK = pygame.mask.from_surface(assets.get(Enemy.IMAGE))
+        return Enemy.MASK
 
-    def collide(self, rect):
+    def collide(self, rect, mask=None):
         """
         check if the given rectangle collides with this enemy.
         :param rect: To check against
+        :param mask: Mask lined up with the rectangle for pixel collisions.
         :return: True if there was a collision.
         """
-        return self.get_rect().colliderect(rect)
+        own_rect = self.get_rect()
+        return own_rect.colliderect(rect) and masks_overlap(own_rect, self.get_mask(), rect, mask)
 
 
 class Enemies:
     """
     Maintains a list of all the enemies in the game. Also controls the adding of a new enemey at the
     specified add interval.
+
+    The enemies are kept in a spatial hash, a grid of CELL_SIZE cells rebuilt every update, so a fireball or the bird
+    is only checked against the enemies in the cells it covers.
     """
     # Frames between an enemy.
     ADD_INTERVAL = 150
 
+    # Width and height of a spatial hash cell.
+    CELL_SIZE = 64
+
     def __init__(self, gamescreen):
         self.enemies_list = []
         self.gamescreen = gamescreen
         self.add_count = 0
+        # Enemies by (column, row) cell.
+        self.grid = {}
 
     def add(self, x, y):
         """
@@ -67,53 +94,132 @@ class Enemies:
         :param x: X coordinate.
         :param y: Y coordiante
         """
-        self.enemies_list.append(Enemy(x, y))
+        enemy = Enemy(x, y)
+        self.enemies_list.append(enemy)
+        self.add_to_grid(enemy)
         self.add_count = 0
 
     def update(self):
         for en in self.enemies_list:
             en.update()
-            if not en.is_visible():
-                self.enemies_list.remove(en)
+        self.enemies_list = [en for en in self.enemies_list if en.is_visible()]
+
+        self.grid = {}
+        for en in self.enemies_list:
+            self.add_to_grid(en)
 
         self.add_count += 1
 
         if self.add_count > Enemies.ADD_INTERVAL:
             self.add(self.gamescreen.get_height()/2, self.gamescreen.get_width())
 
+    @staticmethod
+    def cells(rect):
+        """
+        Get the spatial hash cells a rectangle covers.
+        :param rect: The rectangle.
+        :return: List of (column, row) cells.
+        """
+        x, y, width, height = rect
+        size = Enemies.CELL_SIZE
+        return [(column, row)
+                for column in range(int(x) // size, int(x + width - 1) // size + 1)
+                for row in range(int(y) // size, int(y + height - 1) // size + 1)]
+
+    def add_to_grid(self, enemy):
+        """
+        Add an enemy to the cells it covers.
+        """
+        for cell in Enemies.cells(enemy.get_rect()):
+            self.grid.setdefault(cell, []).append(enemy)
+
+    def nearby(self, rect):
+        """
+        Get the living enemies in the cells a rectangle covers.
+        :param rect: The rectangle.
+        :return: List of enemies, each only once.
+        """
+        found = []
+        for cell in Enemies.cells(rect):
+            for en in self.grid.get(cell, ()):
+                if not en.dead and en not in found:
+                    found.append(en)
+        return found
+
     def draw(self):
         for en in self.enemies_list:
             en.draw(self.gamescreen)
 
-    def collide(self, rect):
+    def collide(self, rect, mask=None):
         """
         Check if any of the enemies have collided with the given rectangle.
         :param rect: Rectangle ot check collisions with.
+        :param mask: Mask lined up with the rectangle for pixel collisions.
         :return: True if an enemy has collided, false if not.
         """
-        for en in self.enemies_list:
-            if en.collide(rect):
+        for en in self.nearby(rect):
+            if en.collide(rect, mask):
                 return True
 
         return False
 
-    def killed(self, fireball_rect):
+    def killed(self, fireball_rect, fireball_mask=None):
         """
         Check if an enmy has been killed by the fireball contained in the given rectangle.
         :param fireball_rect: To check for collisions with
+        :param fireball_mask: Mask lined up with the rectangle for pixel collisions.
         :return: True if the fireball killed an enemy.
         """
-        enemy_has_been_killed = False;
-        for en in self.enemies_list:
-            if en.collide(fireball_rect):
-                self.enemies_list.remove(en)
-                enemy_has_been_killed = True
+        enemy_has_been_killed = self.hit(fireball_rect, fireball_mask)
+        if enemy_has_been_killed:
+            self.remove_dead()
         return enemy_has_been_killed
 
+    def hit(self, fireball_rect, fireball_mask=None):
+        """
+        Mark the enemies hit by a fireball as dead, without removing them yet.
+        :param fireball_rect: To check for collisions with
+        :param fireball_mask: Mask lined up with the rectangle for pixel collisions.
+        :return: True if the fireball hit an enemy.
+        """
+        enemy_has_been_hit = False
+        for en in self.nearby(fireball_rect):
+            if en.collide(fireball_rect, fireball_mask):
+                en.dead = True
+                enemy_has_been_hit = True
+        return enemy_has_been_hit
+
+    def remove_dead(self):
+        """
+        Remove the dead enemies.
+        """
+        self.enemies_list = [en for en in self.enemies_list if not en.dead]
+
+    def shoot(self, fireballs):
+        """
+        Resolve every fireball against the enemies in one pass: fireballs that hit an enemy are freed and the
+        enemies they hit are removed.
+        :param fireballs: The bird's FireballPool.
+        :return: The number of fireballs that hit an enemy.
+        """
+        hits = fireballs.free_where(lambda f: self.hit(f.get_rect(), f.get_mask()))
+        if hits:
+            self.remove_dead()
+        return hits
+
+    def resolve(self, bird):
+        """
+        Resolve every contact between the bird, its fireballs and the enemies.
+        :param bird: The bird.
+        :return: Tuple of the number of fireballs that hit an enemy and whether the bird flew in to an enemy.
+        """
+        hits = self.shoot(bird.fireballs)
+        return hits, self.collide(bird.get_rect(), bird.get_mask())
+
     def reset(self):
         """
         Reset.
         """
         self.add_count = 0
         self.enemies_list = []
-
+        self.grid = {}
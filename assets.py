@@ -0,0 +1,243 @@
+"""
+Loads and converts each image once, the first time it is needed.
+
+Decoding the PNGs is the slow part of starting the game on the Pi, so the decoded pixels are also kept in a cache
+file. On the next start the file is memory mapped and the pixels are converted straight from it. An image is
+decoded again whenever its file changes.
+
+When atlas.py has packed the sprites in to an atlas, the atlas is loaded once and each sprite is a subsurface of it.
+
+    import assets
+    image = assets.get("bird_wing_up")
+
+"""
+
+import atexit
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+# Where the images are, each one is named by its path in here without the extension, e.g. "numbers/0".
+IMAGES = "resources/images"
+
+# The decoded pixel cache, it is safe to delete.
+CACHE_FILE = "resources/assets.cache"
+
+# The sprite atlas and its manifest, written by atlas.py.
+ATLAS_FILE = "resources/atlas.png"
+ATLAS_MANIFEST = "resources/atlas.json"
+
+# Start of the cache file, change the version when the layout changes.
+CACHE_MAGIC = b"FBASSET1"
+
+
+class AssetManager:
+    """
+    Loads images on first use and caches their decoded pixels on disk.
+
+    The cache file is the magic, the length of a JSON index, the index, then the raw pixels of each image. The index
+    maps each image to its pixel offset and size and the modification time and size of the file it was decoded
+    from.
+    """
+
+    def __init__(self, directory=IMAGES, cache_file=CACHE_FILE, atlas_manifest=ATLAS_MANIFEST):
+        """
+        Initialize the asset manager.
+
+        :param directory: Directory the images are in.
+        :param cache_file: The decoded pixel cache file, None to not cache.
+        :param atlas_manifest: The sprite atlas manifest, None to load every sprite from its own file.
+        """
+        self.directory = directory
+        self.cache_file = cache_file
+
+        # Converted images by (name, alpha).
+        self.images = {}
+
+        # The cache file, its index and where the pixels start.
+        self.cache = None
+        self.index = {}
+        self.pixels_start = 0
+        # Pixels decoded this run that are not in the cache file yet, by index key.
+        self.decoded = {}
+
+        # Where each sprite is in the atlas by name, and the atlas once it is loaded.
+        self.sprites = {}
+        self.atlas_file = None
+        self.atlas = None
+
+        self.open_cache()
+        self.open_atlas(atlas_manifest)
+
+    def get(self, name, alpha=True):
+        """
+        Get an image, converted for fast drawing on the display.
+
+        :param name: Name of the image, its path in the images directory without the extension.
+        :param alpha: Keep the image's transparency, False for opaque images such as the backgrounds.
+        :return: The image.
+        """
+        key = (name, alpha)
+        image = self.images.get(key)
+        if image is None:
+            if alpha:
+                image = self.get_sprite(name)
+            if image is None:
+                image = self.load(name, os.path.join(self.directory, name + ".png"), alpha)
+                image = image.convert_alpha() if alpha else image.convert()
+            self.images[key] = image
+        return image
+
+    def get_sprite(self, name):
+        """
+        Get a sprite from the atlas.
+
+        :param name: Name of the sprite.
+        :return: Subsurface of the atlas, None if the sprite is not in the atlas or changed since it was packed.
+        """
+        sprite = self.sprites.get(name)
+        if sprite is None:
+            return None
+
+        stat = os.stat(os.path.join(self.directory, name + ".png"))
+        if sprite["mtime"] != stat.st_mtime or sprite["file_size"] != stat.st_size:
+            return None
+
+        if self.atlas is None:
+            try:
+                self.atlas = self.load("atlas", self.atlas_file, True).convert_alpha()
+            except (OSError, pygame.error):
+                # Every sprite falls back to its own file.
+                self.sprites = {}
+                return None
+        return self.atlas.subsurface((sprite["x"], sprite["y"], sprite["width"], sprite["height"]))
+
+    def load(self, name, path, alpha):
+        """
+        Load an image from the cache file, or decode it if it is not there.
+
+        :param name: Name the image is cached by.
+        :param path: The image file.
+        :param alpha: Keep the image's transparency.
+        :return: The unconverted image.
+        """
+        stat = os.stat(path)
+        pixel_format = "RGBA" if alpha else "RGB"
+        key = "{}:{}".format(name, pixel_format)
+
+        entry = self.index.get(key)
+        if entry and entry["mtime"] == stat.st_mtime and entry["file_size"] == stat.st_size:
+            start = self.pixels_start + entry["offset"]
+            pixels = memoryview(self.cache)[start:start + entry["length"]]
+            return pygame.image.frombuffer(pixels, (entry["width"], entry["height"]), pixel_format)
+
+        image = pygame.image.load(path)
+        if self.cache_file:
+            if not self.decoded:
+                atexit.register(self.save)
+            pixels = pygame.image.tobytes(image, pixel_format)
+            self.decoded[key] = ({"width": image.get_width(), "height": image.get_height(), "length": len(pixels),
+                                  "mtime": stat.st_mtime, "file_size": stat.st_size}, pixels)
+        return image
+
+    def open_cache(self):
+        """
+        Memory map the cache file and read its index. A missing or broken cache file is ignored.
+        """
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+
+        try:
+            with open(self.cache_file, "rb") as f:
+                cache = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            header = len(CACHE_MAGIC) + 4
+            if cache[:len(CACHE_MAGIC)] != CACHE_MAGIC:
+                cache.close()
+                return
+            index_length = struct.unpack("<I", cache[len(CACHE_MAGIC):header])[0]
+            self.index = json.loads(cache[header:header + index_length].decode("utf-8"))
+            self.pixels_start = header + index_length
+            self.cache = cache
+        except (OSError, ValueError, struct.error):
+            self.index = {}
+
+    def open_atlas(self, manifest_file):
+        """
+        Read the atlas manifest, the atlas itself is loaded when the first sprite is needed. A missing or broken
+        manifest, or a manifest without its atlas image, is ignored.
+        """
+        if not manifest_file or not os.path.exists(manifest_file):
+            return
+
+        try:
+            with open(manifest_file) as f:
+                manifest = json.load(f)
+            atlas_file = os.path.join(os.path.dirname(manifest_file), manifest["image"])
+            if os.path.exists(atlas_file):
+                self.sprites = manifest["sprites"]
+                self.atlas_file = atlas_file
+        except (OSError, ValueError, KeyError):
+            self.sprites = {}
+
+    def save(self):
+        """
+        Write the cache file with the images decoded this run added to it.
+        """
+        if not self.decoded:
+            return
+
+        # Keep what is already cached, the newly decoded images replace old versions.
+        entries = []
+        for key, entry in self.index.items():
+            if key not in self.decoded:
+                start = self.pixels_start + entry["offset"]
+                entries.append((key, entry, self.cache[start:start + entry["length"]]))
+        for key, (entry, pixels) in self.decoded.items():
+            entries.append((key, entry, pixels))
+
+        index = {}
+        offset = 0
+        for key, entry, pixels in entries:
+            index[key] = dict(entry, offset=offset)
+            offset += len(pixels)
+        index = json.dumps(index, sort_keys=True).encode("utf-8")
+
+        temporary = self.cache_file + ".tmp"
+        try:
+            with open(temporary, "wb") as f:
+                f.write(CACHE_MAGIC)
+                f.write(struct.pack("<I", len(index)))
+                f.write(index)
+                for key, entry, pixels in entries:
+                    f.write(pixels)
+            os.replace(temporary, self.cache_file)
+        except OSError:
+            # The cache only speeds up starting, carry on without it.
+            return
+
+        self.decoded = {}
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        self.open_cache()
+
+
+# The asset manager used by the game, made on first use.
+_manager = None
+
+
+def get(name, alpha=True):
+    """
+    Get an image from the game's asset manager.
+
+    :param name: Name of the image, its path in the images directory without the extension.
+    :param alpha: Keep the image's transparency, False for opaque images such as the backgrounds.
+    :return: The image.
+    """
+    global _manager
+    if _manager is None:
+        _manager = AssetManager()
+    return _manager.get(name, alpha)
@@ -0,0 +1,105 @@
+"""
+Packs the sprites in to one texture atlas.
+
+    python atlas.py
+
+writes resources/atlas.png and a manifest, resources/atlas.json, with where each sprite is in it. When the atlas is
+there the assets module loads it once and hands out subsurfaces of it instead of loading every sprite on its own.
+Run it again after changing a sprite, until then the changed sprite is loaded from its own file.
+
+"""
+
+import json
+import os
+
+import pygame
+
+from assets import IMAGES, ATLAS_FILE, ATLAS_MANIFEST
+
+# Images left out of the atlas, the backgrounds are opaque and drawn on their own and pipe is not used.
+SKIP = ("background", "night_background", "pipe")
+
+# Width of the atlas, wide enough for the widest sprite.
+WIDTH = 512
+
+# Empty pixels around each sprite so smooth scaling never picks up its neighbours.
+PADDING = 1
+
+
+def find_images(directory=IMAGES):
+    """
+    Find the images to pack.
+
+    :param directory: Directory the images are in.
+    :return: Sorted list of image names, their paths in the directory without the extension.
+    """
+    names = []
+    for folder, subfolders, files in os.walk(directory):
+        for file_name in files:
+            name, extension = os.path.splitext(os.path.relpath(os.path.join(folder, file_name), directory))
+            name = name.replace(os.sep, "/")
+            if extension == ".png" and name not in SKIP:
+                names.append(name)
+    return sorted(names)
+
+
+def pack(sizes, width=WIDTH, padding=PADDING):
+    """
+    Place rectangles in rows, tallest first.
+
+    :param sizes: Dictionary of (width, height) by name.
+    :param width: Width of the atlas.
+    :param padding: Space around each rectangle.
+    :return: Tuple of a dictionary of (x, y) by name and the height of the atlas.
+    """
+    positions = {}
+    x = y = row_height = 0
+    for name in sorted(sizes, key=lambda n: (-sizes[n][1], -sizes[n][0], n)):
+        w, h = sizes[name]
+        if w + 2 * padding > width:
+            raise ValueError("{} is wider than the atlas".format(name))
+        if x + w + 2 * padding > width:
+            x = 0
+            y += row_height
+            row_height = 0
+        positions[name] = (x + padding, y + padding)
+        x += w + 2 * padding
+        row_height = max(row_height, h + 2 * padding)
+    return positions, y + row_height
+
+
+def build(directory=IMAGES, atlas_file=ATLAS_FILE, manifest_file=ATLAS_MANIFEST):
+    """
+    Build the atlas and its manifest.
+
+    :param directory: Directory the images are in.
+    :param atlas_file: The atlas image to write.
+    :param manifest_file: The manifest to write.
+    :return: The manifest.
+    """
+    images = {}
+    for name in find_images(directory):
+        images[name] = pygame.image.load(os.path.join(directory, name + ".png"))
+
+    positions, height = pack(dict((name, image.get_size()) for name, image in images.items()))
+
+    atlas = pygame.Surface((WIDTH, height), pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+    sprites = {}
+    for name, image in images.items():
+        atlas.blit(image, positions[name])
+        stat = os.stat(os.path.join(directory, name + ".png"))
+        sprites[name] = {"x": positions[name][0], "y": positions[name][1],
+                         "width": image.get_width(), "height": image.get_height(),
+                         "mtime": stat.st_mtime, "file_size": stat.st_size}
+
+    pygame.image.save(atlas, atlas_file)
+    manifest = {"image": os.path.basename(atlas_file), "sprites": sprites}
+    with open(manifest_file, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+if __name__ == "__main__":
+    manifest = build()
+    print("Packed {} sprites in to {}".format(len(manifest["sprites"]), ATLAS_FILE))
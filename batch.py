@@ -0,0 +1,185 @@
+"""
+Many birds flying the same pipe course at once.
+
+The birds are kept in NumPy arrays and stepped together, so thousands of agents can be evaluated for the cost of a
+handful of Python objects. The pipes are the engine's own Pipes, there are only ever two or three of them on screen
+so they are shared by every bird.
+
+Run this file to check the batch against the single bird engine.
+
+"""
+
+import random
+
+import numpy as np
+
+import engine
+from engine import SCREENWIDTH, SCREENHEIGHT, Bird, Course, Pipe, Pipes
+
+
+class BatchGame:
+    """
+    A batch of birds flying the same seeded pipe course. Birds that crash stop moving and keep their score.
+    """
+
+    def __init__(self, size, seed=None, start_pipe=1):
+        """
+        Initialize the batch.
+
+        :param size: Number of birds.
+        :param seed: Seed for the pipe course, the same seed plays the same course as engine.Game.
+        :param start_pipe: Number of the first pipe, to practice the later, harder pipes.
+        """
+        self.size = size
+        self.seed = seed
+        self.start_pipe = start_pipe
+        self.reset()
+
+    def reset(self):
+        """
+        Put every bird back to the start of a fresh course.
+        """
+        self.random = random.Random(self.seed)
+
+        # The birds, all start in the same spot.
+        self.x = int(SCREENWIDTH / 2)
+        self.y = np.full(self.size, SCREENHEIGHT // 2, dtype=np.int32)
+        self.climbingcount = np.zeros(self.size, dtype=np.int32)
+        self.alive = np.ones(self.size, dtype=bool)
+        self.scores = np.zeros(self.size, dtype=np.int32)
+        self.frames = np.zeros(self.size, dtype=np.int32)
+
+        # The shared pipe course, the same one engine.Game makes.
+        self.pipe_counter = 0
+        self.course = Course(self.random.getrandbits(64), self.start_pipe)
+        self.pipes_list = [Pipes(next(self.course))]
+
+    @property
+    def done(self):
+        """
+        :return: True once every bird has crashed.
+        """
+        return not self.alive.any()
+
+    def step(self, climb=None):
+        """
+        Advance every living bird by one frame.
+
+        :param climb: Boolean array, True for each bird that climbs this frame. None for no climbing.
+        :return: The alive array.
+        """
+        alive = self.alive
+
+        if climb is not None:
+            self.climbingcount[np.asarray(climb, dtype=bool) & alive] = Bird.CLIMB_DURATION
+
+        # Climb or fall, the same as Bird.update.
+        climbing = alive & (self.climbingcount > 0)
+        falling = alive & ~climbing & (self.y < SCREENHEIGHT - Bird.HEIGHT)
+        self.y[climbing] -= Bird.CLIMB_SPEED
+        self.climbingcount[climbing] -= 1
+        self.y[falling] += Bird.FALL_SPEED
+        self.frames[alive] += 1
+
+        # Move the pipes and add new ones, the same as Game.update.
+        for p in self.pipes_list:
+            p.update()
+        self.pipes_list = [p for p in self.pipes_list if p.is_visible()]
+
+        self.pipe_counter += 1
+        if self.pipe_counter > Pipes.ADD_INTERVAL:
+            self.pipes_list.append(Pipes(next(self.course)))
+            self.pipe_counter = 0
+
+        # Every bird shares an x position so a pipe is passed by all of them at once.
+        for pipes in self.pipes_list:
+            if pipes.passed(self) and not pipes.score_counted:
+                pipes.score_counted = True
+                self.scores[alive] += 1
+                break
+
+        self.alive = alive & ~self.crashed()
+        return self.alive
+
+    def crashed(self):
+        """
+        Check which birds crashed in to the ground or a pipe, the same as Bird.crashed.
+
+        :return: Boolean array, True for each bird that crashed.
+        """
+        crashed = self.y >= SCREENHEIGHT - Bird.HEIGHT
+
+        bird_left = self.x + Bird.HITBOX.x
+        bird_top = self.y + Bird.HITBOX.y
+        bird_bottom = bird_top + Bird.HITBOX.height
+
+        # Pipes are in order from left to right, only the ones in the birds' column can be hit.
+        for pipes in self.pipes_list:
+            if pipes.x + Pipe.WIDTH <= bird_left:
+                continue
+            if pipes.x >= bird_left + Bird.HITBOX.width:
+                break
+            for p in (pipes.top_pipe, pipes.bottom_pipe):
+                rect = p.get_rect()
+                crashed |= (bird_top < rect.y + rect.height) & (rect.y < bird_bottom)
+
+        return crashed
+
+    def run(self, policy, max_frames=None):
+        """
+        Play until every bird has crashed.
+
+        :param policy: Called with the batch each frame, returns the climb array for step().
+        :param max_frames: Stop after this many frames even if birds are still alive.
+        :return: The scores array.
+        """
+        frame = 0
+        while not self.done and (max_frames is None or frame < max_frames):
+            self.step(policy(self))
+            frame += 1
+        return self.scores
+
+
+def check_parity(size=200, frames=3000, seed=0, start_pipe=1):
+    """
+    Fly the same birds through the batch and through engine.Game one at a time and compare where they ended up.
+
+    :param size: Number of birds.
+    :param frames: Number of frames to play.
+    :param seed: Seed for the course and the random climbing.
+    :param start_pipe: Number of the first pipe, from Pipes.START_MOVING_Y_COUNT on the pipes move up and down.
+    :return: True if every bird matches.
+    """
+    climbs = np.random.RandomState(seed).random_sample((frames, size)) < 0.12
+
+    batch = BatchGame(size, seed, start_pipe)
+    for frame in range(frames):
+        batch.step(climbs[frame])
+
+    matched = True
+    for b in range(size):
+        game = engine.Game(seed, start_pipe)
+        game.started = True
+        for frame in range(frames):
+            if game.game_over:
+                break
+            if climbs[frame, b]:
+                game.bird.climb()
+            game.update()
+
+        if (game.bird.y != batch.y[b] or game.bird.score.score_count != batch.scores[b] or
+                game.frames != batch.frames[b] or game.game_over == batch.alive[b]):
+            print("Bird {} differs: engine y={} score={} frames={}, batch y={} score={} frames={}".format(
+                b, game.bird.y, game.bird.score.score_count, game.frames, batch.y[b], batch.scores[b],
+                batch.frames[b]))
+            matched = False
+
+    return matched
+
+
+if __name__ == "__main__":
+    # Fixed pipes from the start of a course, then moving pipes.
+    if check_parity() and check_parity(start_pipe=Pipes.START_MOVING_Y_COUNT):
+        print("Batch matches the engine.")
+    else:
+        raise SystemExit(1)
@@ -0,0 +1,353 @@
+"""
+Benchmark the game with scripted scenarios, without a display.
+
+Each scenario plays the real game classes for a number of frames under SDL's dummy video driver and reports frames
+per second and the cost of each phase of a frame. Results are saved as JSON so runs can be compared:
+
+    python benchmark.py --save before.json
+    python benchmark.py --compare before.json
+
+--memory reports the bytes each bird, pipe, fireball and enemy takes instead, and the artwork they all share:
+
+    python benchmark.py --memory
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import pygame
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import assets
+from flappybird import Game, Bird, Pipe, Score, screen
+from Enemies import Enemy, Enemies
+from engine import Background, Fireball, Pipes
+from profiler import Profiler
+from renderer import Renderer, DirtyRectRenderer, TextureRenderer
+import runner
+
+# Frames to play per scenario.
+FRAMES = 600
+
+# Seed for every scenario's pipe course.
+SEED = 0
+
+
+def steady_flight(game, enemies):
+    """
+    The bird flies through the pipes the way a player would.
+    """
+    if runner.gap_policy(game):
+        game.climb()
+
+
+def fireballs(game, enemies):
+    """
+    Keep 50 fireballs on screen.
+    """
+    steady_flight(game, enemies)
+    for i in range(50 - len(game.bird.fireballs)):
+        game.fire()
+
+
+def with_enemies(game, enemies):
+    """
+    Dozens of enemies come on screen and get shot at.
+    """
+    steady_flight(game, enemies)
+    if game.frames % 3 == 0:
+        game.fire()
+
+
+def day_night(game, enemies):
+    """
+    Stay in the day/night transition the whole time.
+    """
+    steady_flight(game, enemies)
+    if game.background.count < Background.DAY_NIGHT_LENGTH - Background.TRANSITION_TIME:
+        game.background.count = Background.DAY_NIGHT_LENGTH - Background.TRANSITION_TIME
+
+
+# Name, function called before each frame, Pipes settings and whether enemies are on.
+SCENARIOS = (
+    ("steady flight", steady_flight, {}, False),
+    # As many pipes on screen as fit, moving up and down.
+    ("max pipes", steady_flight, {"ADD_INTERVAL": 40, "START_MOVING_Y_COUNT": 0}, False),
+    ("50 fireballs", fireballs, {}, False),
+    ("enemies", with_enemies, {}, True),
+    ("day/night transition", day_night, {}, False),
+)
+
+# Frames between enemies when they are on.
+ENEMY_INTERVAL = 2
+
+
+def play(scenario, frames=FRAMES, dirty_rects=False, textures=False):
+    """
+    Play a scenario.
+
+    :param scenario: Entry from SCENARIOS.
+    :param frames: Number of frames to play.
+    :param dirty_rects: Use the dirty rectangle renderer.
+    :param textures: Use the texture renderer with SDL's software renderer.
+    :return: Dictionary with the frames per second and the Profiler summary.
+    """
+    name, before_frame, settings, enemies_on = scenario
+
+    defaults = dict((setting, getattr(Pipes, setting)) for setting in settings)
+    for setting, value in settings.items():
+        setattr(Pipes, setting, value)
+    enemy_interval = Enemies.ADD_INTERVAL
+
+    try:
+        game = Game(SEED)
+        game.started = True
+
+        if textures:
+            renderer = TextureRenderer(screen, accelerated=False)
+        elif dirty_rects:
+            renderer = DirtyRectRenderer(screen)
+        else:
+            renderer = Renderer(screen)
+
+        enemies = None
+        if enemies_on:
+            enemies = Enemies(renderer)
+            Enemies.ADD_INTERVAL = ENEMY_INTERVAL
+
+        profiler = Profiler(frames)
+        profiler.instrument(game, "update_bird", "bird update")
+        profiler.instrument(game.background, "update", "background update")
+        profiler.instrument(game, "update_pipes", "pipes update")
+        profiler.instrument(game, "check_crash", "collisions")
+
+        start = time.perf_counter()
+        for frame in range(frames):
+            profiler.frame()
+            before_frame(game, enemies)
+
+            game.update()
+            # The bird never dies so every scenario keeps going, collisions are still checked and timed.
+            game.game_over = False
+
+            if enemies:
+                with profiler.phase("enemies update"):
+                    enemies.update()
+                    enemies.resolve(game.bird)
+
+            with profiler.phase("draw background"):
+                renderer.start(game.background)
+            with profiler.phase("draw pipes"):
+                for p in game.pipes_list:
+                    p.draw(renderer)
+            with profiler.phase("draw bird"):
+                game.bird.draw(renderer)
+            if enemies:
+                with profiler.phase("draw enemies"):
+                    enemies.draw()
+            with profiler.phase("flip"):
+                renderer.finish()
+        elapsed = time.perf_counter() - start
+    finally:
+        for setting, value in defaults.items():
+            setattr(Pipes, setting, value)
+        Enemies.ADD_INTERVAL = enemy_interval
+
+    return {"name": name, "frames": frames, "fps": frames / elapsed, "phases": profiler.summary()}
+
+
+def run(frames=FRAMES, dirty_rects=False, names=None, textures=False):
+    """
+    Play every scenario.
+
+    :param frames: Number of frames to play for each scenario.
+    :param dirty_rects: Use the dirty rectangle renderer.
+    :param names: Names of the scenarios to play, defaults to all of them.
+    :param textures: Use the texture renderer with SDL's software renderer.
+    :return: Dictionary with details of the machine and the results of each scenario.
+    """
+    results = []
+    for scenario in SCENARIOS:
+        if names and scenario[0] not in names:
+            continue
+        results.append(play(scenario, frames, dirty_rects, textures))
+
+    return {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "frames": frames,
+        "dirty_rects": dirty_rects,
+        "textures": textures,
+        "scenarios": results,
+    }
+
+
+def report(results, compare=None):
+    """
+    Print the results.
+
+    :param results: Results from run().
+    :param compare: Earlier results from run() to compare against.
+    """
+    earlier = {}
+    if compare:
+        earlier = dict((s["name"], s) for s in compare["scenarios"])
+
+    for scenario in results["scenarios"]:
+        before = earlier.get(scenario["name"])
+        line = "{:<22}{:>9.1f} fps".format(scenario["name"], scenario["fps"])
+        if before:
+            line += "  ({:+.1f}%)".format(100.0 * (scenario["fps"] / before["fps"] - 1))
+        print(line)
+
+        before_phases = dict((p["name"], p) for p in before["phases"]) if before else {}
+        for phase in scenario["phases"]:
+            line = "    {:<20}{:>8.3f} ms mean{:>8.3f} ms p95".format(phase["name"], phase["mean"], phase["p95"])
+            if phase["name"] in before_phases:
+                line += "  (was {:.3f} ms)".format(before_phases[phase["name"]]["mean"])
+            print(line)
+
+
+# Entities in the memory report.
+ENTITIES = (Bird, Pipes, Pipe, Fireball, Enemy)
+
+
+def sizeof(obj, seen):
+    """
+    Get the bytes used by an object and everything it holds on to that is its own. Classes, functions, surfaces
+    and the small ints and singletons Python shares are left out.
+
+    :param obj: The object.
+    :param seen: Set of ids already counted, or not to count, added to.
+    :return: Size in bytes.
+    """
+    if id(obj) in seen or obj is None or isinstance(obj, (bool, type, pygame.Surface)) or callable(obj):
+        return 0
+    if isinstance(obj, int) and -5 <= obj <= 256:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return size + sum(sizeof(k, seen) + sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(sizeof(item, seen) for item in obj)
+
+    if hasattr(obj, "__dict__"):
+        size += sizeof(obj.__dict__, seen)
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            size += sizeof(getattr(obj, name, None), seen)
+    return size
+
+
+def surface_bytes(surfaces):
+    """
+    Get the bytes of pixels in surfaces, a subsurface counts its parent once.
+
+    :param surfaces: The surfaces.
+    :return: Size in bytes.
+    """
+    parents = {}
+    for surface in surfaces:
+        while surface.get_parent() is not None:
+            surface = surface.get_parent()
+        parents[id(surface)] = surface
+    return sum(s.get_pitch() * s.get_height() for s in parents.values())
+
+
+def memory(frames=FRAMES):
+    """
+    Play a game with fireballs and enemies, then measure its entities.
+
+    :param frames: Number of frames to play first.
+    :return: List of (name, count, bytes each) tuples, then the bytes of shared artwork.
+    """
+    game = Game(SEED)
+    game.started = True
+    enemies = Enemies(Renderer(screen))
+    enemy_interval = Enemies.ADD_INTERVAL
+    Enemies.ADD_INTERVAL = ENEMY_INTERVAL
+    try:
+        for frame in range(frames):
+            with_enemies(game, enemies)
+            game.update()
+            game.game_over = False
+            enemies.update()
+            enemies.resolve(game.bird)
+    finally:
+        Enemies.ADD_INTERVAL = enemy_interval
+
+    # The whole fireball pool, spare fireballs take memory too.
+    entities = [game.bird]
+    for p in game.pipes_list:
+        entities.extend((p, p.top_pipe, p.bottom_pipe))
+    entities.extend(game.bird.fireballs.pool)
+    entities.extend(enemies.enemies_list)
+
+    # An entity's size leaves out the other entities it holds and the hitboxes pipes share.
+    others = set(id(e) for e in entities)
+    others.update(id(hitbox) for hitbox in Pipe.HITBOXES.values())
+    rows = []
+    for cls in ENTITIES:
+        sizes = [sizeof(e, others - {id(e)}) for e in entities if isinstance(e, cls)]
+        if sizes:
+            rows.append((cls.__name__, len(sizes), sum(sizes) // len(sizes)))
+
+    manager = assets._manager
+    surfaces = list(manager.images.values()) if manager is not None else []
+    surfaces.extend(Pipe.SURFACES.values())
+    surfaces.extend(Score.SURFACES.values())
+    return rows, surface_bytes(surfaces)
+
+
+def report_memory(frames=FRAMES):
+    """
+    Print the memory report.
+
+    :param frames: Number of frames to play first.
+    """
+    rows, shared = memory(frames)
+    for name, count, size in rows:
+        print("{:<12}{:>6} x {:>6} bytes = {:>8} bytes".format(name, count, size, count * size))
+    print("{:<12}{:>34} bytes".format("artwork", shared))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flappy bird scenarios without a display.")
+    parser.add_argument("--frames", type=int, default=FRAMES, help="frames to play per scenario")
+    parser.add_argument("--dirty-rects", action="store_true", help="use the dirty rectangle renderer")
+    parser.add_argument("--textures", action="store_true", help="use the texture renderer, in software")
+    parser.add_argument("--scenario", action="append", help="only play this scenario, can be repeated")
+    parser.add_argument("--save", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="compare against results saved with --save")
+    parser.add_argument("--memory", action="store_true", help="report the bytes each entity takes instead")
+    args = parser.parse_args()
+
+    if args.memory:
+        report_memory(args.frames)
+        return
+
+    compare = None
+    if args.compare:
+        with open(args.compare) as f:
+            compare = json.load(f)
+
+    results = run(args.frames, args.dirty_rects, args.scenario, args.textures)
+    report(results, compare)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
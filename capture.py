@@ -0,0 +1,235 @@
+"""
+Capture the frames the game draws to disk without holding up the game.
+
+Each captured frame is copied in to a bounded queue and a pool of worker threads writes it out, so a slow disk or
+encoder never stalls the frame loop. When the queue is full the frame is dropped and counted instead.
+
+Frames are written as a numbered PNG sequence, one file per frame, or as a single video stream: raw RGB24, or
+YUV4MPEG2 (.y4m) which ffmpeg and most players read directly:
+
+    ffmpeg -i captures/20170518-120000/video.y4m highlight.mp4
+
+"""
+
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    # Only needed for y4m.
+    np = None
+
+from engine import FPS
+
+PNG = "png"
+RAW = "raw"
+Y4M = "y4m"
+FORMATS = (PNG, RAW, Y4M)
+
+
+class FrameCapture:
+    """
+    Writes captured frames from a pool of worker threads.
+    """
+
+    # Frames waiting to be written.
+    QUEUE_SIZE = 16
+
+    # Worker threads.
+    WORKERS = 2
+
+    # zlib level for PNGs, 1 is fastest and 9 smallest.
+    PNG_COMPRESSION = 6
+
+    def __init__(self, directory, frame_format=PNG, fps=FPS, every=1, workers=WORKERS, queue_size=QUEUE_SIZE):
+        """
+        Initialize the capture and start its workers.
+
+        :param directory: Directory to write in to, it is made if it is not there.
+        :param frame_format: PNG, RAW or Y4M.
+        :param fps: Frames a second offered to capture(), the video plays at fps / every.
+        :param every: Only capture every this many frames, to keep up on a slow machine.
+        :param workers: Number of worker threads.
+        :param queue_size: Frames waiting to be written before frames are dropped.
+        """
+        if frame_format not in FORMATS:
+            raise ValueError("unknown format " + frame_format)
+        if frame_format == Y4M and np is None:
+            raise RuntimeError("y4m needs NumPy")
+
+        self.directory = directory
+        self.frame_format = frame_format
+        self.fps = fps
+        self.every = every
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # Frames offered, frames queued and frames dropped because the queue was full.
+        self.offered = 0
+        self.captured = 0
+        self.dropped = 0
+
+        self.frames = queue.Queue(queue_size)
+        self.stopping = threading.Event()
+
+        # A video is one stream so frames are written in order, encoded frames wait here for the ones before them.
+        self.stream = None
+        self.encoded = {}
+        self.next_to_write = 0
+        self.stream_lock = threading.Lock()
+
+        self.workers = [threading.Thread(target=self.work, name="capture {}".format(i)) for i in range(workers)]
+        for worker in self.workers:
+            worker.daemon = True
+            worker.start()
+
+    def capture(self, surface):
+        """
+        Capture a frame, from the frame loop. Never waits.
+
+        :param surface: The drawn frame.
+        :return: True if the frame was queued.
+        """
+        self.offered += 1
+        if (self.offered - 1) % self.every:
+            return False
+        if self.frames.full():
+            self.dropped += 1
+            return False
+
+        # The frame is copied, the surface is drawn over for the next frame.
+        self.frames.put_nowait((self.captured, surface.get_size(), pygame.image.tobytes(surface, "RGB")))
+        self.captured += 1
+        return True
+
+    def stop(self, wait=True):
+        """
+        Stop capturing, the workers finish writing the frames still queued.
+
+        :param wait: Wait for the frames to be written, False to finish them in the background.
+        """
+        self.stopping.set()
+        if wait:
+            self.close()
+        else:
+            threading.Thread(target=self.close, name="capture close").start()
+
+    def close(self):
+        """
+        Wait for the workers to finish and close the video.
+        """
+        for worker in self.workers:
+            worker.join()
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def work(self):
+        while True:
+            try:
+                number, size, pixels = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                if self.stopping.is_set():
+                    return
+                continue
+            if self.frame_format == PNG:
+                with open(os.path.join(self.directory, "frame_{:06d}.png".format(number)), "wb") as f:
+                    f.write(FrameCapture.png(pixels, size))
+            elif self.frame_format == Y4M:
+                self.write(number, size, b"FRAME\n" + FrameCapture.yuv420(pixels, size))
+            else:
+                self.write(number, size, pixels)
+
+    def write(self, number, size, data):
+        """
+        Write an encoded frame to the video once the frames before it are written.
+        """
+        with self.stream_lock:
+            if self.stream is None:
+                self.stream = open(os.path.join(self.directory, "video." + self.frame_format), "wb")
+                if self.frame_format == Y4M:
+                    width, height = size
+                    # The rate is a fraction so every need not divide fps.
+                    self.stream.write("YUV4MPEG2 W{} H{} F{}:{} Ip A1:1 C420jpeg\n".format(
+                        width, height, self.fps, self.every).encode("ascii"))
+
+            self.encoded[number] = data
+            while self.next_to_write in self.encoded:
+                self.stream.write(self.encoded.pop(self.next_to_write))
+                self.next_to_write += 1
+
+    @staticmethod
+    def png(pixels, size):
+        """
+        Encode RGB pixels as a PNG.
+
+        This is done here rather than with pygame.image.save() because zlib lets other threads run while it
+        compresses, pygame holds up the frame loop while it saves.
+
+        :param pixels: RGB bytes.
+        :param size: (width, height).
+        :return: The PNG file.
+        """
+        width, height = size
+        stride = width * 3
+        # Each row starts with its filter type, 0 for none.
+        rows = b"".join(b"\x00" + pixels[y * stride:(y + 1) * stride] for y in range(height))
+
+        def chunk(kind, data):
+            return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+        return (b"\x89PNG\r\n\x1a\n" +
+                chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)) +
+                chunk(b"IDAT", zlib.compress(rows, FrameCapture.PNG_COMPRESSION)) +
+                chunk(b"IEND", b""))
+
+    @staticmethod
+    def yuv420(pixels, size):
+        """
+        Convert RGB pixels to full range YUV with the colour at half the resolution, as y4m's C420jpeg.
+
+        :param pixels: RGB bytes.
+        :param size: (width, height), both even.
+        :return: The Y, U and V planes.
+        """
+        width, height = size
+        rgb = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 3).astype(np.float32)
+        r, g, b = rgb[:, :, 0], rgb[:, :, 1], rgb[:, :, 2]
+
+        y = 0.299 * r + 0.587 * g + 0.114 * b
+        # Average each 2x2 block for the colour.
+        r = r.reshape(height // 2, 2, width // 2, 2).mean(axis=(1, 3))
+        g = g.reshape(height // 2, 2, width // 2, 2).mean(axis=(1, 3))
+        b = b.reshape(height // 2, 2, width // 2, 2).mean(axis=(1, 3))
+        u = 128 - 0.168736 * r - 0.331264 * g + 0.5 * b
+        v = 128 + 0.5 * r - 0.418688 * g - 0.081312 * b
+
+        planes = [np.clip(np.rint(plane), 0, 255).astype(np.uint8).tobytes() for plane in (y, u, v)]
+        return b"".join(planes)
+
+
+def new_directory(parent):
+    """
+    Make a directory for one capture, named by the time. Captures started in the same second get a number on the
+    end so they never share a directory.
+
+    :param parent: Directory to make it in, it is made if it is not there.
+    :return: Path of the new directory.
+    """
+    name = os.path.join(parent, time.strftime("%Y%m%d-%H%M%S"))
+    path = name
+    number = 1
+    while True:
+        try:
+            os.makedirs(path)
+            return path
+        except FileExistsError:
+            number += 1
+            path = "{}-{}".format(name, number)
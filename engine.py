@@ -0,0 +1,872 @@
+"""
+The flappy bird game logic.
+
+Nothing in here touches pygame, there are no surfaces, images or a display. The game can be stepped as fast as
+the CPU allows which makes it usable for balancing and testing on machines without a screen. flappybird.py draws
+on top of these classes.
+
+"""
+
+from collections import deque, namedtuple
+import random
+
+# Static game variables.
+FPS = 30
+SCREENWIDTH = 284
+SCREENHEIGHT = 512
+
+
+class Rect(namedtuple("Rect", "x y width height")):
+    """
+    A screen rectangle, works anywhere pygame expects a rectangle.
+    """
+
+    __slots__ = ()
+
+    def colliderect(self, other):
+        """
+        Check if the two rectangles overlap, the same way pygame.Rect.colliderect does.
+
+        :param other: The other rectangle, any (x, y, width, height) sequence.
+        :return: True if the rectangles overlap.
+        """
+        x, y, width, height = other
+        return (self.width > 0 and self.height > 0 and width > 0 and height > 0 and
+                self.x < x + width and x < self.x + self.width and
+                self.y < y + height and y < self.y + self.height)
+
+
+def masks_overlap(rect, mask, other_rect, other_mask):
+    """
+    Check if two colliding rectangles really overlap, pixel by pixel. Each mask lines up with the top left of its
+    rectangle.
+
+    :param rect: The first rectangle.
+    :param mask: Mask of the first rectangle, or None.
+    :param other_rect: The other rectangle.
+    :param other_mask: Mask of the other rectangle, or None.
+    :return: True if the masks overlap, or if either mask is missing, in which case the rectangles decide.
+    """
+    if mask is None or other_mask is None:
+        return True
+    return mask.overlap(other_mask, (other_rect[0] - rect[0], other_rect[1] - rect[1])) is not None
+
+
+class Score:
+    """
+    Maintains the score.
+    """
+    __slots__ = ("score_count",)
+
+    def __init__(self):
+        # The score.
+        self.score_count = 0
+
+    def score(self):
+        """
+        Increment the score.
+
+        :return: The updated score.
+        """
+        self.score_count += 1
+        return self.score_count
+
+
+class Fireball:
+    """
+    A Fireball the bird can launch.
+    """
+    __slots__ = ("x", "y", "number")
+
+    WIDTH = 50
+    HEIGHT = 15
+    SPEED = 5
+
+    def __init__(self, start_x, start_y, number=0):
+        self.launch(start_x, start_y, number)
+
+    def launch(self, start_x, start_y, number=0):
+        """
+        Launch the fireball from the bird's position.
+
+        :param start_x: The bird's x position.
+        :param start_y: The bird's y position.
+        :param number: Tells this launch apart from earlier launches of a reused fireball.
+        """
+        self.x = start_x + 16
+        self.y = start_y
+        self.number = number
+
+    def update(self):
+        self.x += Fireball.SPEED
+
+    def is_visible(self):
+        """
+        Is the fireball still visible.
+        :return: True if the fireball has not moved past the right of the screen.
+        """
+        return self.x < SCREENWIDTH
+
+    def get_rect(self):
+        """
+        Get the screen rectangle around the fireball.
+        :return: Rectangle with game screen position.
+        """
+        return Rect(int(self.x), int(self.y), Fireball.WIDTH, Fireball.HEIGHT)
+
+    def get_mask(self):
+        """
+        Get the mask for pixel collisions.
+        :return: The mask lined up with get_rect(), None to collide with the whole rectangle.
+        """
+        return None
+
+
+class FireballPool:
+    """
+    A fixed number of fireballs that are reused instead of made for every launch.
+
+    The first count fireballs are flying, the rest are free. A fireball that lands is swapped with the last flying
+    one, so nothing is allocated or shifted while the game runs.
+    """
+    __slots__ = ("pool", "count", "launches")
+
+    # Most fireballs that can be flying at once, launches are ignored when they are all in use.
+    CAPACITY = 64
+
+    def __init__(self, fireball_class=Fireball, capacity=CAPACITY):
+        """
+        Initialize the pool.
+
+        :param fireball_class: Class of the fireballs.
+        :param capacity: Number of fireballs.
+        """
+        self.pool = [fireball_class(0, 0) for i in range(capacity)]
+        self.count = 0
+        # Number of launches so far.
+        self.launches = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        pool = self.pool
+        for i in range(self.count):
+            yield pool[i]
+
+    def launch(self, x, y):
+        """
+        Launch a fireball.
+
+        :param x: The bird's x position.
+        :param y: The bird's y position.
+        :return: The fireball, or None if they are all flying.
+        """
+        if self.count == len(self.pool):
+            return None
+
+        self.launches += 1
+        f = self.pool[self.count]
+        f.launch(x, y, self.launches)
+        self.count += 1
+        return f
+
+    def update(self):
+        """
+        Move the fireballs, freeing the ones that are no longer visible.
+        """
+        pool = self.pool
+        i = 0
+        while i < self.count:
+            f = pool[i]
+            f.update()
+            if f.is_visible():
+                i += 1
+            else:
+                self.free(i)
+
+    def free_where(self, test):
+        """
+        Free every flying fireball the test is true for.
+
+        :param test: Called with each fireball.
+        :return: Number of fireballs freed.
+        """
+        pool = self.pool
+        freed = 0
+        i = 0
+        while i < self.count:
+            if test(pool[i]):
+                self.free(i)
+                freed += 1
+            else:
+                i += 1
+        return freed
+
+    def free(self, i):
+        """
+        Free the flying fireball at the given index by swapping it with the last flying one.
+        """
+        last = self.count - 1
+        self.pool[i], self.pool[last] = self.pool[last], self.pool[i]
+        self.count = last
+
+    def clear(self):
+        """
+        Free every fireball.
+        """
+        self.count = 0
+
+
+class Bird:
+    """
+    Represents the Bird flying through the game.
+    """
+    __slots__ = ("x", "y", "width", "height", "showing_wing_up", "wing_up", "flap_count", "climbingcount", "score",
+                 "fireballs")
+
+    HEIGHT = WIDTH = 32
+    CLIMB_DURATION = 8
+    FLAP_DURATION = 5
+
+    # Pixels per frame moved when climbing and falling.
+    CLIMB_SPEED = 4
+    FALL_SPEED = 3
+
+    # The opaque part of the bird images, both wing up and wing down, relative to the bird's position.
+    HITBOX = Rect(0, 2, 32, 28)
+
+    # What the bird crashed in to.
+    CRASH_GROUND = "ground"
+    CRASH_TOP_PIPE = "top pipe"
+    CRASH_BOTTOM_PIPE = "bottom pipe"
+
+    # Classes used for the score and fireballs, drawable versions are swapped in by flappybird.py.
+    SCORE_CLASS = Score
+    FIREBALL_CLASS = Fireball
+
+    def __init__(self, x, y):
+        # The bird's position
+        self.x, self.y = x, y
+        self.width, self.height = Bird.WIDTH, Bird.HEIGHT
+
+        # Which wing image is showing and which one is next.
+        self.showing_wing_up = True
+        self.wing_up = True
+
+        self.flap_count = 0
+        self.climbingcount = 0
+
+        self.score = self.SCORE_CLASS()
+        self.fireballs = FireballPool(self.FIREBALL_CLASS)
+
+    def climb(self):
+        """
+        Make the bird climb.
+
+        """
+        self.climbingcount = Bird.CLIMB_DURATION
+
+    def update(self):
+        """
+        Update the Bird. This is meant to be called every time through the game loop because the bird is
+        always falling.
+        """
+        if self.climbingcount > 0:
+            self.y -= Bird.CLIMB_SPEED
+            self.climbingcount -= 1
+        else:
+            if self.y < (SCREENHEIGHT - self.height):
+                self.y += Bird.FALL_SPEED
+
+        # Flap the wings
+        self.flap()
+
+        self.fireballs.update()
+
+    def flap(self):
+        """
+        Alternate the wings every FLAP_DURATION count.
+        """
+        if self.flap_count < Bird.FLAP_DURATION:
+            self.flap_count += 1
+        else:
+            self.flap_count = 1
+            self.showing_wing_up = self.wing_up
+            self.wing_up = not self.wing_up
+
+    def crashed(self, p_list):
+        """
+        Check if the bird crashed in to the ground or a pipe in the pipes_list
+
+        :return: True if the bird crashed in to the ground.
+        """
+        return self.crash_cause(p_list) is not None
+
+    def crash_cause(self, p_list):
+        """
+        Find what the bird crashed in to.
+
+        :param p_list: List of pipes to check.
+        :return: CRASH_GROUND, CRASH_TOP_PIPE, CRASH_BOTTOM_PIPE or None if the bird has not crashed.
+        """
+        if self.y >= (SCREENHEIGHT - self.height):
+            return Bird.CRASH_GROUND
+
+        rect = self.get_rect()
+        left, right = rect.x, rect.x + rect.width
+
+        # Pipes are in order from left to right, only the ones in the bird's column can be hit.
+        for p in p_list:
+            if p.x + Pipe.WIDTH <= left:
+                continue
+            if p.x >= right:
+                break
+            if p.top_pipe.collide(self, rect):
+                return Bird.CRASH_TOP_PIPE
+            if p.bottom_pipe.collide(self, rect):
+                return Bird.CRASH_BOTTOM_PIPE
+
+        return None
+
+    def get_rect(self):
+        """
+        Get the bounding rectangle.
+
+        :return: The bounding rectangle.
+        """
+        return Rect(int(self.x) + Bird.HITBOX.x, int(self.y) + Bird.HITBOX.y, Bird.HITBOX.width, Bird.HITBOX.height)
+
+    def get_mask(self):
+        """
+        Get the mask for pixel collisions.
+
+        :return: The mask lined up with get_rect(), None to collide with the whole rectangle.
+        """
+        return None
+
+    def get_image(self):
+        """
+        Get the artwork showing, it never changes so it can be handed to another thread.
+
+        :return: The image, None without a display.
+        """
+        return None
+
+    def scored(self, p_list):
+        """
+        Has the bird scored on the pipe list.
+
+        :param p_list: List of pipes to check if the bird has passed.
+        :return: True if the bird scored.
+        """
+        for pipes in p_list:
+            if pipes.passed(self) and not pipes.score_counted:
+                pipes.score_counted = True
+                self.score.score()
+                return True
+
+        return False
+
+    def reset(self):
+        self.y = SCREENHEIGHT / 2
+        self.score.score_count = 0
+        self.fireballs.clear()
+
+    def fire(self):
+        """
+        Launch a fireball.
+
+        :return: The fireball, or None if too many are flying already.
+        """
+        return self.fireballs.launch(self.x, self.y)
+
+    def killed_enemy(self, enemies):
+        """
+        Have we killed an enemy yet?
+        :param enemies: Enemies to check.
+        :return: True if an enemy has been killed, false otherwise.
+        """
+        return enemies.shoot(self.fireballs) > 0
+
+
+class Pipe:
+    """
+    Represents a single pipe, top or bottom.
+    """
+    __slots__ = ("x", "y", "y_offset", "position", "pieces", "height", "startPosition", "hitbox", "end_position")
+
+    # Flags indicating position and drawing direction.
+    TOP = 0
+    BOTTOM = 1
+
+    # Height of a pipe piece.
+    PIECE_HEIGHT = 32
+    # Width of a pipe.
+    WIDTH = 80
+
+    # How many extra pieces to draw to accommodate for up/down movement
+    EXTRA_PIECES = 1
+
+    # Collision rectangles relative to the pipe's position, by number of pieces.
+    HITBOXES = {}
+
+    def __init__(self, x, pieces, position):
+        self.x = x
+        # Offset to have the pipes move up and down.
+        self.y_offset = 0
+
+        self.position = position
+        self.pieces = pieces
+        self.height = Pipe.PIECE_HEIGHT * (self.pieces + 1 + Pipe.EXTRA_PIECES)
+        self.startPosition = self.calculates_start_position()
+        # Keep track of the pipe's y screen position.
+        self.y = self.startPosition
+        self.hitbox = Pipe.get_hitbox(pieces)
+
+        # If we're a bottom pipe, draw the end at y=0, otherwise use the calculation.
+        if position == Pipe.BOTTOM:
+            self.end_position = 0
+        else:
+            self.end_position = 1
+
+    def calculates_start_position(self):
+        """
+        Calculate the pipe draw start position based on whether or not it's a top pipe or a bottom pipe.
+        :return:  0 if this is a top pipe, or (SCREENHEIGHT - Pipe.PIECE_HEIGHT) to start drawing from
+        """
+        start_pos = (SCREENHEIGHT - self.height) * self.position
+        if self.position == Pipe.TOP:
+            start_pos -= Pipe.PIECE_HEIGHT * Pipe.EXTRA_PIECES
+        else:
+            start_pos += Pipe.PIECE_HEIGHT * Pipe.EXTRA_PIECES
+
+        return start_pos
+
+    def update(self, x, y_offset):
+        """
+        Update the pipe.
+        :param x: New X value.
+        :param y_offset: New up/down offset.
+        """
+        self.x = x
+        self.y_offset = y_offset
+        self.y = self.startPosition + self.y_offset
+
+    @staticmethod
+    def get_hitbox(pieces):
+        """
+        Get the collision rectangle for a pipe shape. The body and end pieces cover the full width and the
+        extra piece at the far end is left empty.
+        :param pieces: Number of pipe pieces.
+        :return: Rectangle relative to the pipe's position.
+        """
+        hitbox = Pipe.HITBOXES.get(pieces)
+        if hitbox is None:
+            hitbox = Pipe.HITBOXES[pieces] = Rect(0, 0, Pipe.WIDTH, Pipe.PIECE_HEIGHT * (pieces + Pipe.EXTRA_PIECES))
+        return hitbox
+
+    def get_rect(self):
+        """
+        Get the screen rectangle around the Pipe.
+        :return: Rectangle with game screen position.
+        """
+        hitbox = self.hitbox
+        return Rect(int(self.x) + hitbox.x, int(self.y) + hitbox.y, hitbox.width, hitbox.height)
+
+    def get_mask(self):
+        """
+        Get the mask for pixel collisions.
+        :return: The mask lined up with get_rect(), None to collide with the whole rectangle.
+        """
+        return None
+
+    def get_image(self):
+        """
+        Get the artwork of the pipe, it never changes so it can be handed to another thread.
+
+        :return: The image, None without a display.
+        """
+        return None
+
+    def collide(self, b, bird_rect=None):
+        """
+        Check if the given bird collides with the pipe's rectangle, then its mask if there is one.
+        :param b: The bird.
+        :param bird_rect: The bird's rectangle if it is already known.
+        :return: True if the bird has collided with this pipe.
+        """
+        if bird_rect is None:
+            bird_rect = b.get_rect()
+        rect = self.get_rect()
+        return rect.colliderect(bird_rect) and masks_overlap(rect, self.get_mask(), bird_rect, b.get_mask())
+
+
+class Pipes:
+    """
+    Represents a pair of pipes that generate with a random gap between them and move from
+    right to left.
+    """
+    __slots__ = ("score_counted", "x", "y", "top_pieces", "bottom_pieces", "top_pipe", "bottom_pipe", "movements",
+                 "movement", "y_movement_duration", "y_movement_direction", "y_movement_count", "number")
+
+    # Frames between adding a pipe.
+    ADD_INTERVAL = 200
+
+    # Pixel per frame speed at which the pipe moves from right to left.
+    PIPE_SPEED = 2
+
+    # Can only have a maximum number of pipe pieces to allow the bird through and to draw the pipe top on each pipe
+    MAX_PIPE_PIECES = (SCREENHEIGHT - 3 * Bird.HEIGHT - 3 * Pipe.PIECE_HEIGHT) // Pipe.PIECE_HEIGHT
+
+    # Min and max number of frames the pipes can move up or down.
+    MIN_PIPE_Y_MOVEMENT = 0
+    MAX_PIPE_Y_MOVEMENT = 50
+    MOVE_UP = 0
+    MOVE_DOWN = 1
+
+    # Start moving in the Y direction after this many pipes
+    START_MOVING_Y_COUNT = 200
+
+    # Class used for the top and bottom pipe, a drawable version is swapped in by flappybird.py.
+    PIPE_CLASS = Pipe
+
+    def __init__(self, layout):
+        """
+        Initialize the pipes.
+
+        :param layout: PipeLayout from the game's Course.
+        """
+        self.score_counted = False
+        self.x = SCREENWIDTH
+        self.y = 0
+
+        # The number of pieces for the top comes from the course.
+        self.top_pieces = layout.top_pieces
+        # The opposite number is how many bottom pieces we have.
+        self.bottom_pieces = Pipes.MAX_PIPE_PIECES - self.top_pieces
+        # Create the pipes.
+        self.top_pipe = self.PIPE_CLASS(self.x, self.top_pieces, Pipe.TOP)
+        self.bottom_pipe = self.PIPE_CLASS(self.x, self.bottom_pieces, Pipe.BOTTOM)
+
+        # The up and down movements, one after the other.
+        self.movements = layout.movements
+        self.movement = 0
+        self.y_movement_duration, self.y_movement_direction = self.movements[0]
+        self.y_movement_count = 0
+        # Which pipe this is in the course.
+        self.number = layout.number
+
+    def update(self):
+        """
+        Update the pipes.
+        """
+
+        # If we are still moving, move up or down accordingly
+        if self.number < Pipes.START_MOVING_Y_COUNT:
+            self.y = 0
+        elif self.y_movement_count < self.y_movement_duration:
+            self.y_movement_count += 1
+            if self.y_movement_direction == Pipes.MOVE_DOWN:
+                self.y += 1
+            elif self.y_movement_direction == Pipes.MOVE_UP:
+                self.y -= 1
+        # Otherwise move on to the next movement
+        else:
+            self.movement = (self.movement + 1) % len(self.movements)
+            self.y_movement_duration, self.y_movement_direction = self.movements[self.movement]
+            self.y_movement_count = 0
+
+        self.x -= 1
+        self.top_pipe.update(self.x, self.y)
+        self.bottom_pipe.update(self.x, self.y)
+
+    def is_visible(self):
+        """
+        Is the pipe pair still visible.
+        :return: True if the pipes has moved past 0, i.e. off screen
+        """
+        return self.x + Pipe.WIDTH > 0
+
+    def collide(self, b):
+        """
+        Check if the bird collided with the pipes.
+        :param b: The bird.
+        :return: True if the bird collided with the top or bottom pipe.
+        """
+        return self.top_pipe.collide(b) or self.bottom_pipe.collide(b)
+
+    def passed(self, bird):
+        return self.x + Pipe.WIDTH < bird.x
+
+
+# A pipe in a course: its number, the number of top pieces and a tuple of (duration, direction) movements.
+PipeLayout = namedtuple("PipeLayout", "number top_pieces movements")
+
+
+class Course:
+    """
+    The pipes of a game, generated from a seed.
+
+    Each pipe is generated from its own random numbers, seeded by the course's seed and the pipe's number, so any
+    pipe can be made without making the ones before it. Everything about a pipe, including all of its up and down
+    movements, is generated before it comes on screen and a few pipes are kept ready ahead of time.
+
+        course = Course(seed, start=200)
+        layout = next(course)
+
+    """
+
+    # Pipes kept ready.
+    LOOKAHEAD = 3
+
+    # Frames a pipe is on screen for, it needs movements for all of them.
+    LIFETIME = SCREENWIDTH + Pipe.WIDTH
+
+    def __init__(self, seed, start=1):
+        """
+        Initialize the course.
+
+        :param seed: Seed for the course, the same seed makes the same pipes.
+        :param start: Number of the first pipe.
+        """
+        self.seed = seed
+        self.buffer = deque()
+        self.jump(start)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """
+        Get the next pipe and top up the pipes kept ready.
+
+        :return: The PipeLayout.
+        """
+        layout = self.buffer.popleft()
+        self.fill()
+        return layout
+
+    def jump(self, number):
+        """
+        Make pipe number the next pipe.
+
+        :param number: Number of the pipe, the first pipe is 1.
+        """
+        self.buffer.clear()
+        self.next_number = number
+        self.fill()
+
+    def fill(self):
+        """
+        Generate pipes until LOOKAHEAD are ready.
+        """
+        while len(self.buffer) < Course.LOOKAHEAD:
+            self.buffer.append(self.layout(self.next_number))
+            self.next_number += 1
+
+    def layout(self, number):
+        """
+        Generate a pipe.
+
+        :param number: Number of the pipe.
+        :return: The PipeLayout.
+        """
+        rng = random.Random("{}:{}".format(self.seed, number))
+        top_pieces = rng.randint(1, Pipes.MAX_PIPE_PIECES)
+
+        # A movement takes its duration plus the frame it changes to the next movement on.
+        movements = []
+        frames = 0
+        while frames < Course.LIFETIME:
+            duration = rng.randint(Pipes.MIN_PIPE_Y_MOVEMENT, Pipes.MAX_PIPE_Y_MOVEMENT)
+            movements.append((duration, rng.randint(Pipes.MOVE_UP, Pipes.MOVE_DOWN)))
+            frames += duration + 1
+
+        return PipeLayout(number, top_pieces, tuple(movements))
+
+
+class Background:
+    """
+    Keeps track of day and night and the transition between them.
+    """
+
+    # Length of  a day or night in frames
+    DAY_NIGHT_LENGTH = 120
+
+    # Dawn/dusk transition frames, for a smooth transition this should be a multiple of 255 (or close to it)
+    # for a smooth transition.
+    TRANSITION_TIME = 51
+
+    def __init__(self):
+        self.count = 0
+        self.day = True
+        self.day_alpha = 255
+        self.night_alpha = 0
+
+    def update(self):
+        """
+        Update the background.
+        """
+        # transition form day to night, or vice versa.
+        if self.count == Background.DAY_NIGHT_LENGTH:
+            self.day = not self.day
+            self.count = 0
+        # Else check for if we are in a transition
+        else:
+            # If we are in a transition smoothly change the alpha accordingly.
+            if (Background.DAY_NIGHT_LENGTH - Background.TRANSITION_TIME) <= self.count <= Background.DAY_NIGHT_LENGTH:
+                if self.day:
+                    self.day_alpha -= 255 / Background.TRANSITION_TIME
+                    self.night_alpha = 255
+                else:
+                    self.night_alpha -= 255 / Background.TRANSITION_TIME
+                    self.day_alpha = 255
+
+        # Increment the time.
+        self.count += 1
+
+    def get_day_weight(self):
+        """
+        Get how much of the day background is showing.
+
+        :return: 0 for full night up to 1 for full day.
+        """
+        # During the day the day fades out over the night, at night the night fades out over the day.
+        if self.day:
+            return self.day_alpha / 255.0
+        else:
+            return 1 - self.night_alpha / 255.0
+
+
+class Game:
+    """
+    The state of a whole game: the bird, the pipes, the background and whether the game is started, paused or
+    over. Each call to update() advances the game by one frame.
+    """
+
+    # Classes used for the game objects, drawable versions are swapped in by flappybird.py.
+    BIRD_CLASS = Bird
+    PIPES_CLASS = Pipes
+    BACKGROUND_CLASS = Background
+
+    def __init__(self, seed=None, start_pipe=1):
+        """
+        Initialize the game.
+
+        :param seed: Seed for the pipe layout and movement, the same seed plays the same course.
+        :param start_pipe: Number of the first pipe, to practice the later, harder pipes.
+        """
+        self.random = random.Random(seed)
+        self.start_pipe = start_pipe
+
+        self.bird = self.BIRD_CLASS(SCREENWIDTH / 2, SCREENHEIGHT / 2)
+        self.background = self.BACKGROUND_CLASS()
+
+        # Keep track of how often to add pipes.
+        self.pipe_counter = 0
+
+        # List of pipes, from the course.
+        self.course = self.new_course()
+        self.pipes_list = [self.PIPES_CLASS(next(self.course))]
+
+        # Tracking pause and game over
+        self.started = False
+        self.paused = False
+        self.game_over = False
+        # What the bird crashed in to once the game is over.
+        self.crash_cause = None
+
+        # Frames played since the game started.
+        self.frames = 0
+
+    def new_course(self):
+        """
+        Make the course for a new game, each reset plays a different course.
+
+        :return: The Course.
+        """
+        return Course(self.random.getrandbits(64), self.start_pipe)
+
+    def climb(self):
+        """
+        Fly, this also starts the game.
+        """
+        self.started = True
+        self.bird.climb()
+
+    def fire(self):
+        """
+        Launch a fireball.
+        """
+        return self.bird.fire()
+
+    def pause(self):
+        """
+        Pause or un-pause the game.
+        """
+        self.paused = not self.paused
+
+    def reset(self):
+        """
+        Clear the pipes and put the bird back to the start.
+        """
+        self.bird.reset()
+        self.pipe_counter = 0
+        self.course = self.new_course()
+        self.pipes_list = [self.PIPES_CLASS(next(self.course))]
+        self.paused = False
+        self.game_over = False
+        self.crash_cause = None
+        self.frames = 0
+
+    def update(self):
+        """
+        Advance the game by one frame.
+
+        :return: True if the game is over.
+        """
+        # Update the bird and pipes if the game is not paused and not game over
+        if not self.started:
+            self.bird.flap()
+        elif not self.paused and not self.game_over:
+            self.frames += 1
+            self.update_bird()
+            self.background.update()
+            self.update_pipes()
+
+            # Update the score.
+            self.bird.scored(self.pipes_list)
+
+        self.check_crash()
+
+        return self.game_over
+
+    def update_bird(self):
+        """
+        Move the bird and its fireballs.
+        """
+        self.bird.update()
+
+    def update_pipes(self):
+        """
+        Move the pipes, removing ones that are no longer visible and adding one every ADD_INTERVAL frames.
+        """
+        for p in self.pipes_list:
+            p.update()
+        self.pipes_list = [p for p in self.pipes_list if p.is_visible()]
+
+        # Increment the pipe counter and add one if it is time to.
+        self.pipe_counter += 1
+        if self.pipe_counter > Pipes.ADD_INTERVAL:
+            self.pipes_list.append(self.PIPES_CLASS(next(self.course)))
+            self.pipe_counter = 0
+
+    def check_crash(self):
+        """
+        End the game if the bird crashed.
+        """
+        cause = self.bird.crash_cause(self.pipes_list)
+        if cause is not None:
+            self.game_over = True
+            self.crash_cause = cause
@@ -0,0 +1,227 @@
+"""
+The game as a reinforcement learning environment, with the same reset() and step() as a Gymnasium environment.
+
+    env = FlappyBirdEnv(observation=FlappyBirdEnv.PIXELS, size=(71, 128), grayscale=True)
+    observation, info = env.reset(seed=0)
+    while True:
+        observation, reward, terminated, truncated, info = env.step(FlappyBirdEnv.FLAP)
+        if terminated or truncated:
+            break
+
+The state observation is a short vector worked out from the engine and needs no display. The pixel observation is
+the drawn frame as a NumPy array. The game is drawn on a surface made over the array's own memory, so the frame is
+in the array as soon as it is drawn, nothing is copied. Scaled and grayscale observations are worked out in to
+arrays made once and reused every step, so an observation is only valid until the next step; copy it to keep it.
+
+Pixels run under SDL's dummy video driver unless another driver is chosen.
+
+"""
+
+import os
+
+import numpy as np
+
+import engine
+from engine import SCREENWIDTH, SCREENHEIGHT, Bird, Pipe
+
+
+class FlappyBirdEnv:
+    """
+    Plays one bird through a seeded course a frame per step.
+    """
+
+    # Actions, a bit for each button.
+    NOTHING = 0
+    FLAP = 1
+    FIRE = 2
+    FLAP_AND_FIRE = FLAP | FIRE
+    ACTIONS = (NOTHING, FLAP, FIRE, FLAP_AND_FIRE)
+
+    # Observations.
+    STATE = "state"
+    PIXELS = "pixels"
+
+    # Pipes ahead of the bird in the state observation.
+    STATE_PIPES = 2
+    # Bird height, climbing, then the distance to, gap top and gap bottom of each pipe, all about 0 to 1.
+    STATE_SIZE = 2 + 3 * STATE_PIPES
+
+    # Reward for each pipe passed and for crashing.
+    PIPE_REWARD = 1.0
+    CRASH_REWARD = -1.0
+
+    # Longest episode, in frames.
+    MAX_FRAMES = 30 * 60 * 10
+
+    # Weights for grayscale, in 256ths.
+    GRAY_WEIGHTS = (77, 150, 29)
+
+    def __init__(self, observation=STATE, size=None, grayscale=False, max_frames=MAX_FRAMES, start_pipe=1):
+        """
+        Initialize the environment.
+
+        :param observation: STATE or PIXELS.
+        :param size: (width, height) to scale pixel observations to, defaults to the game's size.
+        :param grayscale: Give pixel observations with one channel.
+        :param max_frames: Truncate episodes after this many frames.
+        :param start_pipe: Number of the first pipe in each course.
+        """
+        if observation not in (FlappyBirdEnv.STATE, FlappyBirdEnv.PIXELS):
+            raise ValueError("unknown observation " + observation)
+
+        self.observation = observation
+        self.max_frames = max_frames
+        self.start_pipe = start_pipe
+        self.game = None
+        self.seed = None
+
+        self.state = np.zeros(FlappyBirdEnv.STATE_SIZE, dtype=np.float32)
+
+        if observation == FlappyBirdEnv.PIXELS:
+            self.setup_pixels(size, grayscale)
+
+    def setup_pixels(self, size, grayscale):
+        """
+        Make the surfaces and the arrays under them.
+        """
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+        # Opens the display, the drawable game classes need it to convert their images.
+        import flappybird
+        from renderer import Renderer
+
+        self.pygame = pygame
+        self.game_class = flappybird.Game
+
+        # The frame, drawn straight in to the array, the fourth byte of each pixel is unused.
+        self.frame = np.zeros((SCREENHEIGHT, SCREENWIDTH, 4), dtype=np.uint8)
+        self.screen = pygame.image.frombuffer(self.frame, (SCREENWIDTH, SCREENHEIGHT), "RGBX")
+        self.renderer = Renderer(self.screen)
+        self.pixels = self.frame[:, :, :3]
+
+        # The scaled frame, scaled straight in to its array.
+        self.size = size
+        if size is not None and tuple(size) != (SCREENWIDTH, SCREENHEIGHT):
+            width, height = size
+            self.scaled_frame = np.zeros((height, width, 4), dtype=np.uint8)
+            self.scaled = pygame.image.frombuffer(self.scaled_frame, (width, height), "RGBX")
+            self.pixels = self.scaled_frame[:, :, :3]
+        else:
+            self.scaled = None
+
+        self.grayscale = grayscale
+        if grayscale:
+            shape = self.pixels.shape[:2]
+            self.sum = np.zeros(shape, dtype=np.uint16)
+            self.channel = np.zeros(shape, dtype=np.uint16)
+            self.gray = np.zeros(shape, dtype=np.uint8)
+
+    def reset(self, seed=None):
+        """
+        Start a new episode.
+
+        :param seed: Seed for the course, None to carry on from the last seed.
+        :return: Tuple of the first observation and an info dictionary.
+        """
+        if seed is not None:
+            self.seed = seed
+        elif self.seed is not None:
+            self.seed += 1
+
+        if self.observation == FlappyBirdEnv.PIXELS:
+            self.game = self.game_class(self.seed, self.start_pipe)
+        else:
+            self.game = engine.Game(self.seed, self.start_pipe)
+        self.game.started = True
+
+        return self.observe(), self.info()
+
+    def step(self, action):
+        """
+        Play a frame.
+
+        :param action: One of ACTIONS.
+        :return: Tuple of the observation, the reward, whether the bird crashed, whether the episode ran out of
+                 frames and an info dictionary.
+        """
+        game = self.game
+        if action & FlappyBirdEnv.FLAP:
+            game.climb()
+        if action & FlappyBirdEnv.FIRE:
+            game.fire()
+
+        score = game.bird.score.score_count
+        terminated = game.update()
+        reward = FlappyBirdEnv.PIPE_REWARD * (game.bird.score.score_count - score)
+        if terminated:
+            reward += FlappyBirdEnv.CRASH_REWARD
+        truncated = not terminated and game.frames >= self.max_frames
+
+        return self.observe(), reward, terminated, truncated, self.info()
+
+    def info(self):
+        return {"score": self.game.bird.score.score_count, "frames": self.game.frames,
+                "cause": self.game.crash_cause}
+
+    def observe(self):
+        """
+        :return: The observation of the game as it is now.
+        """
+        if self.observation == FlappyBirdEnv.PIXELS:
+            return self.observe_pixels()
+        return self.observe_state()
+
+    def observe_state(self):
+        """
+        Fill in the state vector.
+
+        :return: The state array, reused every step.
+        """
+        game = self.game
+        bird = game.bird
+        state = self.state
+        state[0] = bird.y / float(SCREENHEIGHT)
+        state[1] = bird.climbingcount / float(Bird.CLIMB_DURATION)
+
+        # Pipes not on screen yet are far away with the gap the whole height of the screen.
+        state[2:] = (1.0, 0.0, 1.0) * FlappyBirdEnv.STATE_PIPES
+        i = 2
+        for p in game.pipes_list:
+            if p.x + Pipe.WIDTH < bird.x:
+                continue
+            top = p.top_pipe.get_rect()
+            state[i] = (p.x - bird.x) / float(SCREENWIDTH)
+            state[i + 1] = (top.y + top.height) / float(SCREENHEIGHT)
+            state[i + 2] = p.bottom_pipe.get_rect().y / float(SCREENHEIGHT)
+            i += 3
+            if i >= FlappyBirdEnv.STATE_SIZE:
+                break
+        return state
+
+    def observe_pixels(self):
+        """
+        Draw the frame.
+
+        :return: Array of (height, width, 3) RGB or (height, width) gray pixels, reused every step.
+        """
+        game = self.game
+        self.renderer.start(game.background)
+        for p in game.pipes_list:
+            p.draw(self.renderer)
+        game.bird.draw(self.renderer)
+
+        if self.scaled is not None:
+            self.pygame.transform.smoothscale(self.screen, self.size, self.scaled)
+
+        if not self.grayscale:
+            return self.pixels
+
+        # Weighted sum of the channels, in the buffers made for it.
+        red, green, blue = FlappyBirdEnv.GRAY_WEIGHTS
+        np.multiply(self.pixels[:, :, 0], red, out=self.sum, dtype=np.uint16)
+        np.multiply(self.pixels[:, :, 1], green, out=self.channel, dtype=np.uint16)
+        np.add(self.sum, self.channel, out=self.sum)
+        np.multiply(self.pixels[:, :, 2], blue, out=self.channel, dtype=np.uint16)
+        np.add(self.sum, self.channel, out=self.sum)
+        np.right_shift(self.sum, 8, out=self.gray, casting="unsafe")
+        return self.gray
@@ -5,19 +5,82 @@ November 23, 2016 Update:
     - Added a simple start screen.
     - Added enemies and fireballs to shoot at them.
 
+The game logic lives in engine.py, this draws it and handles the player's input.
+
 """
 
+from collections import OrderedDict
+import os
+import random
+
 import pygame
 from pygame.locals import *
-from random import randint
 import time
-import threading
-
-# Static game variables.
-FPS = 30
-SCREENWIDTH = 284
-SCREENHEIGHT = 512
 
+import assets
+import engine
+from engine import FPS, SCREENWIDTH, SCREENHEIGHT
+from renderer import Renderer, DirtyRectRenderer, ScaledRenderer, TextureRenderer
+from pipeline import Simulation
+from profiler import Profiler
+from replay import Recording
+from log import Log, INFO
+import capture
+
+# Run the game in its own thread and draw it as often as RENDER_FPS allows, instead of one draw per update.
+PIPELINE = True
+# Most frames a second to draw when the game runs in its own thread.
+RENDER_FPS = 60
+# Seconds between checks for input while waiting for the next frame, so input is applied at the next update instead
+# of waiting for the frame after it.
+INPUT_POLL_INTERVAL = 0.002
+
+# Only push the parts of the screen that changed to the display instead of the whole screen every frame.
+DIRTY_RECTS = False
+
+# Size of the display, the game is drawn at SCREENWIDTH x SCREENHEIGHT and the whole frame is scaled to fit it.
+# (0, 0) uses the monitor's resolution, None draws straight on a display the size of the game. Dirty rectangles are
+# not used when scaling.
+DISPLAY_SIZE = None
+FULLSCREEN = False
+# ScaledRenderer.NEAREST for sharp pixels or ScaledRenderer.SMOOTH.
+SCALE_FILTER = ScaledRenderer.NEAREST
+# Only scale by whole numbers so every pixel is the same size.
+INTEGER_SCALE = True
+
+# Draw with textures through SDL's renderer, on the GPU when there is one, instead of blitting surfaces. The window
+# is DISPLAY_SIZE and the GPU scales the game to it. Needs pygame 2.
+TEXTURE_RENDERER = False
+# Use the GPU, False for SDL's software renderer.
+ACCELERATED = True
+
+# Collide with the visible pixels of the bird, pipes, fireballs and enemies instead of their rectangles.
+PIXEL_COLLISIONS = False
+
+# File to write the frame timings to when the game quits, .csv or .json. None to not write them.
+PROFILE_FILE = None
+
+# Number of the first pipe, start further in to practice the pipes that move up and down.
+START_PIPE = 1
+
+# Directory to record every game in, see replay.py. None to not record.
+RECORDING_DIRECTORY = "recordings"
+
+# What v captures the frames as: capture.PNG, capture.RAW or capture.Y4M, each capture in its own directory in
+# CAPTURE_DIRECTORY. Frames are written from other threads and dropped if they can not keep up.
+CAPTURE_FORMAT = capture.PNG
+CAPTURE_DIRECTORY = "captures"
+# Only capture every this many frames.
+CAPTURE_EVERY = 1
+
+# Log file, written from its own thread so logging never holds up a frame. None to not write one.
+LOG_FILE = "flappybird.log"
+# Lowest level to log, DEBUG logs every input event.
+LOG_LEVEL = INFO
+
+
+# Logs nowhere until the game is run, importing the module for its classes writes no log file.
+log = Log(None)
 
 # Initialize the game.
 pygame.init()
@@ -29,315 +92,287 @@ pygame.joystick.init()
 pygame.event.set_allowed([QUIT, KEYDOWN, KEYUP, pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP])
 
 # flags = DOUBLEBUF
-screen = pygame.display.set_mode((SCREENWIDTH, SCREENHEIGHT))
+if TEXTURE_RENDERER:
+    # The renderer opens its own window, this one is hidden and only there so images can be converted.
+    screen = pygame.display.set_mode((SCREENWIDTH, SCREENHEIGHT), pygame.HIDDEN)
+elif DISPLAY_SIZE is None:
+    screen = pygame.display.set_mode((SCREENWIDTH, SCREENHEIGHT))
+else:
+    display = pygame.display.set_mode(DISPLAY_SIZE, pygame.FULLSCREEN if FULLSCREEN else 0)
+    # The game screen everything is drawn on, scaled to the display by the renderer.
+    screen = pygame.Surface((SCREENWIDTH, SCREENHEIGHT)).convert()
 pygame.mouse.set_visible(False)
 
-from Enemies import Enemy, Enemies
+from Enemies import Enemy
+
+Enemy.PIXEL_COLLISIONS = PIXEL_COLLISIONS
 
 
-# Background image
-background_image = pygame.image.load("resources/images/background.png").convert_alpha()
-# Paused image
-paused_image = pygame.image.load("resources/images/paused.png").convert_alpha()
-# Game over image.
-game_over_image = pygame.image.load("resources/images/game_over.png").convert_alpha()
-# Get Ready Image
-get_ready_image = pygame.image.load("resources/images/get_ready.png").convert_alpha()
+# Names of the images drawn over the game, loaded by the assets module the first time they are drawn.
+PAUSED_IMAGE = "paused"
+GAME_OVER_IMAGE = "game_over"
+GET_READY_IMAGE = "get_ready"
 
-# Clock to control the frame rate
-clock = pygame.time.Clock()
+# When the next frame is due, by time.perf_counter().
+next_frame = time.perf_counter()
 
 
-class Bird:
+class Score(engine.Score):
     """
-    Represents the Bird flying through the game.
+    Maintains and renders the score.
     """
+    __slots__ = ("surface", "rendered_count")
 
-    HEIGHT = WIDTH = 32
-    CLIMB_DURATION = 8
-    FLAP_DURATION = 5
+    # Names of the number images.
+    NUMBERS = tuple("numbers/{}".format(i) for i in range(10))
 
-    def __init__(self, x, y):
-        # The bird's position
-        self.x, self.y = x, y
-        self.width, self.height = 32, 32
-
-        # The bird's image.
-        self.wing_up_image = pygame.image.load("resources/images/bird_wing_up.png").convert_alpha()
-        self.wing_down_image = pygame.image.load("resources/images/bird_wing_down.png").convert_alpha()
-        self.wing_up = True
-        self.image = self.wing_up_image
-        self.surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+    # The width of a number, plus some padding.
+    NUMBER_WIDTH = 24 + 1
+    # Number height
+    NUMBER_HEIGHT = 36
+    # Number of digits to leave room for, bigger scores grow to the left.
+    DIGITS = 3
 
-        self.flap_count = 0
-        self.climbingcount = 0
+    # Rendered score surfaces shared by every score, keyed by value, least recently used first.
+    SURFACES = OrderedDict()
+    # Most rendered scores to keep around.
+    MAX_SURFACES = 16
 
-        self.score = Score()
-        self.fireballs = []
+    def __init__(self):
+        super(Score, self).__init__()
+        # Area the score is rendered on, and which score is on it.
+        self.surface = Score.get_surface(self.score_count)
+        self.rendered_count = self.score_count
 
-    def climb(self):
+    @staticmethod
+    def get_surface(score_count):
         """
-        Make the bird climb.
+        Get the rendered surface for a score.
 
+        :param score_count: The score.
+        :return: The score surface.
         """
-        self.climbingcount = Bird.CLIMB_DURATION
+        surface = Score.SURFACES.get(score_count)
+        if surface is None:
+            surface = Score.render(score_count)
+            Score.SURFACES[score_count] = surface
+            if len(Score.SURFACES) > Score.MAX_SURFACES:
+                Score.SURFACES.popitem(last=False)
+        else:
+            Score.SURFACES.move_to_end(score_count)
+        return surface
 
-    def update(self):
+    @staticmethod
+    def render(score_count):
         """
-        Update the Bird. This is meant to be called every time through the game loop because the bird is
-        always falling.
-        """
-        if self.climbingcount > 0:
-            self.y -= 4
-            self.climbingcount -= 1
-        else:
-            if self.y < (SCREENHEIGHT - self.height):
-                self.y += 3
+        Render the digits of a score.
 
-        # Flap the wings
-        self.flap()
+        :param score_count: The score.
+        :return: A new surface with the score drawn on it.
+        """
+        score_string = str(score_count)
+        digits = max(Score.DIGITS, len(score_string))
+        surface = pygame.Surface((digits * Score.NUMBER_WIDTH, Score.NUMBER_HEIGHT), pygame.SRCALPHA)
 
-        for f in self.fireballs:
-            f.update()
+        # Draw each digit.
+        digit_count = 0
+        for d in score_string:
+            surface.blit(assets.get(Score.NUMBERS[int(d)]), (digit_count * Score.NUMBER_WIDTH, 0))
+            digit_count += 1
 
-        for f in self.fireballs:
-            if not f.is_visible():
-                self.fireballs.remove(f)
+        return surface.convert_alpha()
 
-    def flap(self):
+    def draw(self, gamescreen):
         """
-        Alternate the wings every FLAP_DURATION count.
+        Draw the current score on the game screen, it is only rendered again when it changes.
+
+        :param gamescreen: The game screen to draw on.
         """
-        if self.flap_count < Bird.FLAP_DURATION:
-            self.flap_count += 1
-        else:
-            self.flap_count = 1
+        if self.score_count != self.rendered_count:
+            self.surface = Score.get_surface(self.score_count)
+            self.rendered_count = self.score_count
 
-            if self.wing_up:
-                self.image = self.wing_up_image
-            else:
-                self.image = self.wing_down_image
+        gamescreen.blit(self.surface, (SCREENWIDTH - self.surface.get_width(), 5))
 
-            self.wing_up = not self.wing_up
 
-    def draw(self, gamescreen):
-        """
-        Draw the bird on the given game screen.
+class Fireball(engine.Fireball):
+    """
+    A Fireball the bird can launch.
+    """
+    __slots__ = ()
 
-        :param gamescreen: The game screen.
-        """
-        self.score.draw(gamescreen)
-        self.surface.fill(0)
-        self.surface.blit(self.image, (0, 0))
-        gamescreen.blit(self.surface, (self.x, self.y))
-        for f in self.fireballs:
-            f.draw(gamescreen)
+    FIREBALL_IMAGE = "fireball"
+    # Mask for pixel collisions, made the first time it is needed.
+    MASK = None
 
-    def crashed(self, p_list): #, enemies):
+    def get_mask(self):
         """
-        Check if the bird crashed in to the ground or a pipe in the pipes_list
-
-        :return: True if the bird crashed in to the ground.
+        Get the mask for pixel collisions.
+        :return: The mask lined up with get_rect(), None to collide with the whole rectangle.
         """
-        if self.y >= (SCREENHEIGHT - self.height):
-            return True
+        if not PIXEL_COLLISIONS:
+            return None
+        if Fireball.MASK is None:
+            Fireball.MASK = pygame.mask.from_surface(assets.get(Fireball.FIREBALL_IMAGE))
+        return Fireball.MASK
 
-        for p in p_list:
-            if p.collide(self):
-                return True
+    def draw(self, gamescreen):
+        gamescreen.blit(assets.get(Fireball.FIREBALL_IMAGE), (self.x, self.y))
 
-        # return enemies.collide(self.get_rect())
 
-    def get_rect(self):
-        """
-        Get the bounding rectangle.
+class Bird(engine.Bird):
+    """
+    Represents the Bird flying through the game.
+    """
+    __slots__ = ("wing_up_image", "wing_down_image")
 
-        :return: The bounding rectangle.
-        """
-        return self.surface.get_bounding_rect().move(self.x, self.y)
+    SCORE_CLASS = Score
+    FIREBALL_CLASS = Fireball
 
-    def scored(self, p_list):
-        """
-        Has the bird scored on the pipe list.
+    # Masks for pixel collisions by whether the wing is up, made the first time they are needed.
+    MASKS = {}
+
+    def __init__(self, x, y):
+        super(Bird, self).__init__(x, y)
 
-        :param p_list: List of pipes to check if the bird has passed.
-        :return: True if the bird scored.
+        # The bird's images, shared with every other bird.
+        self.wing_up_image = assets.get("bird_wing_up")
+        self.wing_down_image = assets.get("bird_wing_down")
+
+    def get_mask(self):
         """
-        for pipes in p_list:
-            if pipes.passed(self) and not pipes.score_counted:
-                pipes.score_counted = True
-                self.score.score()
-                return True
+        Get the mask for pixel collisions, for the wing image that is showing.
 
-        return False
+        :return: The mask lined up with get_rect(), None to collide with the whole rectangle.
+        """
+        if not PIXEL_COLLISIONS:
+            return None
 
-    def reset(self):
-        self.y = SCREENHEIGHT / 2
-        self.score.score_count = 0
-        self.fireballs = []
+        mask = Bird.MASKS.get(self.showing_wing_up)
+        if mask is None:
+            image = self.wing_up_image if self.showing_wing_up else self.wing_down_image
+            mask = Bird.MASKS[self.showing_wing_up] = pygame.mask.from_surface(image.subsurface(Bird.HITBOX))
+        return mask
 
-    def fire(self):
+    def get_image(self):
         """
-        Launch a fireball.
+        Get the wing image showing.
+
+        :return: The image, shared with every other bird.
         """
-        self.fireballs.append(Fireball(self.x, self.y))
+        return self.wing_up_image if self.showing_wing_up else self.wing_down_image
 
-    def killed_enemy(self, enemies):
+    def draw(self, gamescreen):
         """
-        Have we killed an enemy yet?
-        :param enemies: Enemies to check.
-        :return: True if an enemy has been killed, false otherwise.
+        Draw the bird on the given game screen.
+
+        :param gamescreen: The game screen.
         """
-        killed = False;
+        self.score.draw(gamescreen)
+        gamescreen.blit(self.get_image(), (self.x, self.y))
         for f in self.fireballs:
-            if enemies.killed(f.get_rect()):
-                killed = True
-                self.fireballs.remove(f)
-        return killed
+            f.draw(gamescreen)
 
 
-class Pipe:
+class Pipe(engine.Pipe):
     """
     Represents a single pipe, top or bottom.
     """
-
-    # Flags indicating position and drawing direction.
-    TOP = 0
-    BOTTOM = 1
-
-    # Height of a pipe piece.
-    PIECE_HEIGHT = 32
-    # Width of a pipe.
-    WIDTH = 80
+    __slots__ = ("surface",)
 
     # Pipe Images
-    BODY_IMAGE = pygame.image.load("resources/images/pipe_body.png").convert_alpha()
-
-    END_IMAGE = pygame.image.load("resources/images/pipe_end.png").convert_alpha();
+    BODY_IMAGE = "pipe_body"
+    END_IMAGE = "pipe_end"
 
+    # Composed pipe surfaces shared by every pipe, keyed by (pieces, position), least recently used first.
+    SURFACES = OrderedDict()
+    # Most composed surfaces to keep around.
+    MAX_SURFACES = 2 * (engine.Pipes.MAX_PIPE_PIECES + 1)
 
-    # How many extra pieces to draw to accommodate for up/down movement
-    EXTRA_PIECES = 1
+    # Masks for pixel collisions keyed by (pieces, position), made the first time they are needed.
+    MASKS = {}
 
     def __init__(self, x, pieces, position):
-        self.x = x
-        self.y = 0
-        # Offset to have the pipes move up and down.
-        self.y_offset = 0
+        super(Pipe, self).__init__(x, pieces, position)
+        self.surface = Pipe.get_surface(pieces, position)
 
-        self.position = position
-        self.pieces = pieces
-        self.height = Pipe.PIECE_HEIGHT * (self.pieces + 1 + Pipe.EXTRA_PIECES)
-        self.startPosition = self.calculates_start_position()
-
-        self.surface = pygame.Surface((Pipe.WIDTH, self.height), pygame.SRCALPHA)
-
-        # If we're a bottom pipe, draw the end at y=0, otherwise use the calculation.
-        if position == Pipe.BOTTOM:
-            self.end_position = 0
-        else:
-            self.end_position = 1
-
-    def draw(self, gamescreen):
+    def get_mask(self):
         """
-        Draw the Pipe.
+        Get the mask for pixel collisions.
+        :return: The mask lined up with get_rect(), None to collide with the whole rectangle.
         """
-        self.surface.fill(0)
-        for i in range(0, self.pieces + Pipe.EXTRA_PIECES):
-            self.surface.blit(Pipe.BODY_IMAGE, (0, i * Pipe.PIECE_HEIGHT))
+        if not PIXEL_COLLISIONS:
+            return None
 
-        # Keep track of the pipe's y screen position.
-        self.y = self.startPosition + self.y_offset
-        self.surface.blit(Pipe.END_IMAGE, (0, i * Pipe.PIECE_HEIGHT * self.end_position))
-        # Draw the pipe's surface.
-        gamescreen.blit(self.surface, (self.x, self.y))
+        key = (self.pieces, self.position)
+        mask = Pipe.MASKS.get(key)
+        if mask is None:
+            mask = Pipe.MASKS[key] = pygame.mask.from_surface(self.surface.subsurface(self.hitbox))
+        return mask
 
-    def calculates_start_position(self):
-        """
-        Calculate the pipe draw start position based on whether or not it's a top pipe or a bottom pipe.
-        :return:  0 if this is a top pipe, or (SCREENHEIGHT - Pipe.PIECE_HEIGHT) to start drawing from
+    def get_image(self):
         """
-        # start_pos = (SCREENHEIGHT - Pipe.PIECE_HEIGHT) * self.position
-        start_pos = (SCREENHEIGHT - self.height) * self.position
-        if self.position == Pipe.TOP:
-            start_pos -= Pipe.PIECE_HEIGHT * Pipe.EXTRA_PIECES
-        else:
-            start_pos += Pipe.PIECE_HEIGHT * Pipe.EXTRA_PIECES
+        Get the composed pipe.
 
-        return start_pos
+        :return: The image, shared with every other pipe of the same shape.
+        """
+        return self.surface
 
-    def update(self, x, y_offset):
+    @staticmethod
+    def get_surface(pieces, position):
         """
-        Update the pipe.
-        :param x: New X value.
+        Get the composed surface for a pipe, a pipe looks the same for its whole life so it is only composed once.
+
+        :param pieces: Number of pipe pieces.
+        :param position: Pipe.TOP or Pipe.BOTTOM.
+        :return: The pipe surface.
         """
-        self.x = x
-        self.y_offset = y_offset
+        key = (pieces, position)
+        surface = Pipe.SURFACES.get(key)
+        if surface is None:
+            surface = Pipe.compose(pieces, position)
+            Pipe.SURFACES[key] = surface
+            if len(Pipe.SURFACES) > Pipe.MAX_SURFACES:
+                Pipe.SURFACES.popitem(last=False)
+        else:
+            Pipe.SURFACES.move_to_end(key)
+        return surface
 
-    def get_rect(self):
+    @staticmethod
+    def compose(pieces, position):
         """
-        Get the screen rectangle around the Pipe.
-        :return: Rectangle with game screen position.
+        Build a pipe out of body pieces and the end piece.
+
+        :param pieces: Number of pipe pieces.
+        :param position: Pipe.TOP or Pipe.BOTTOM.
+        :return: A new surface with the pipe drawn on it.
         """
-        return self.surface.get_bounding_rect().move(self.x, self.y)
+        height = Pipe.PIECE_HEIGHT * (pieces + 1 + Pipe.EXTRA_PIECES)
+        surface = pygame.Surface((Pipe.WIDTH, height), pygame.SRCALPHA)
+        body = assets.get(Pipe.BODY_IMAGE)
+        for i in range(0, pieces + Pipe.EXTRA_PIECES):
+            surface.blit(body, (0, i * Pipe.PIECE_HEIGHT))
+
+        # The end goes on the bottom of a top pipe and the top of a bottom pipe.
+        end_position = 1 if position == Pipe.TOP else 0
+        surface.blit(assets.get(Pipe.END_IMAGE), (0, i * Pipe.PIECE_HEIGHT * end_position))
+        return surface.convert_alpha()
 
-    def collide(self, b):
+    def draw(self, gamescreen):
         """
-        Check if the given bird collides with the pipe's rectangle.
-        :param b: The bird.
-        :return: True if the bird has collided with this pipe.
+        Draw the Pipe.
         """
-        return self.get_rect().colliderect(b.get_rect())
+        gamescreen.blit(self.surface, (self.x, self.y))
 
 
-class Pipes:
+class Pipes(engine.Pipes):
     """
     Represents a pair of pipes that generate with a random gap between them and move from
     right to left.
     """
+    __slots__ = ()
 
-    # Frames between adding a pipe.
-    ADD_INTERVAL = 200
-
-    # Pixel per frame speed at which the pipe moves from right to left.
-    PIPE_SPEED = 2
-
-    # Can only have a maximum number of pipe pieces to allow the bird through and to draw the pipe top on each pipe
-    MAX_PIPE_PIECES = (SCREENHEIGHT - 3 * Bird.HEIGHT - 3 * Pipe.PIECE_HEIGHT) / Pipe.PIECE_HEIGHT
-
-    # Min and max number of frames the pipes can move up or down.
-    MIN_PIPE_Y_MOVEMENT = 0
-    MAX_PIPE_Y_MOVEMENT = 50
-    MOVE_UP = 0
-    MOVE_DOWN = 1
-
-    # Start moving in the Y direction after this many pipes
-    START_MOVING_Y_COUNT = 200
-
-    def __init__(self, gamescreen, number_of_pipes):
-        """
-        Initialize the pipes.
-
-        :param gamescreen: The game screen.
-        :param number_of_pipes: The number of this pipe.
-        """
-        self.score_counted = False
-        self.x = SCREENWIDTH
-        self.y = 0
-
-        # Randomly generate the number of pipes for the top.
-        self.top_pieces = randint(1, Pipes.MAX_PIPE_PIECES)
-        # The opposite number is how many bottom pieces we have.
-        self.bottom_pieces = Pipes.MAX_PIPE_PIECES - self.top_pieces
-        # Create the pipes.
-        self.top_pipe = Pipe(self.x, self.top_pieces, Pipe.TOP)
-        self.bottom_pipe = Pipe(self.x, self.bottom_pieces, Pipe.BOTTOM)
-
-        self.y_movement_duration = randint(Pipes.MIN_PIPE_Y_MOVEMENT, Pipes.MAX_PIPE_Y_MOVEMENT)
-        self.y_movement_direction = randint(Pipes.MOVE_UP, Pipes.MOVE_DOWN)
-        self.y_movement_count = 0
-        # This is the next pipe.
-        self.number = number_of_pipes + 1
+    PIPE_CLASS = Pipe
 
     def draw(self, gamescreen):
         """
@@ -347,240 +382,130 @@ class Pipes:
         self.top_pipe.draw(gamescreen)
         self.bottom_pipe.draw(gamescreen)
 
-    def update(self):
-        """
-        Update the pipes.
-        """
-
-        # If we are still moving, move up or down accordingly
-        if self.number < Pipes.START_MOVING_Y_COUNT:
-            self.y = 0
-        elif self.y_movement_count < self.y_movement_duration:
-            self.y_movement_count += 1
-            if self.y_movement_direction == Pipes.MOVE_DOWN:
-                self.y += 1
-            elif self.y_movement_direction == Pipes.MOVE_UP:
-                self.y -= 1
-        # Otherwise reset the movement for the next time around
-        else:
-            self.y_movement_duration = randint(Pipes.MIN_PIPE_Y_MOVEMENT, Pipes.MAX_PIPE_Y_MOVEMENT)
-            self.y_movement_direction = randint(Pipes.MOVE_UP, Pipes.MOVE_DOWN)
-            self.y_movement_count = 0
-
-        self.x -= 1
-        self.top_pipe.update(self.x, self.y)
-        self.bottom_pipe.update(self.x, self.y)
-
-    def is_visible(self):
-        """
-        Is the pipe pair still visible.
-        :return: True if the pipes has moved past 0, i.e. off screen
-        """
-        return self.x + Pipe.WIDTH > 0
-
-    def collide(self, b):
-        """
-        Check if the bird collided with the pipes.
-        :param b: The bird.
-        :return: True if the bird collided with the top or bottom pipe.
-        """
-        return self.top_pipe.collide(b) or self.bottom_pipe.collide(b)
 
-    def passed(self, bird):
-        if self.x + Pipe.WIDTH < bird.x:
-            return True
-        else:
-            return False
-
-
-class Score:
+class Background(engine.Background):
     """
-    Maintains and renders the score.
+    Keeps track of the background image and switches them accordingly.
     """
 
-    # The number images.
-    NUMBERS = (
-        pygame.image.load('resources/images/numbers/0.png').convert_alpha(),
-        pygame.image.load('resources/images/numbers/1.png').convert_alpha(),
-        pygame.image.load('resources/images/numbers/2.png').convert_alpha(),
-        pygame.image.load('resources/images/numbers/3.png').convert_alpha(),
-        pygame.image.load('resources/images/numbers/4.png').convert_alpha(),
-        pygame.image.load('resources/images/numbers/5.png').convert_alpha(),
-        pygame.image.load('resources/images/numbers/6.png').convert_alpha(),
-        pygame.image.load('resources/images/numbers/7.png').convert_alpha(),
-        pygame.image.load('resources/images/numbers/8.png').convert_alpha(),
-        pygame.image.load('resources/images/numbers/9.png').convert_alpha()
-    )
-
-    # The width of a number, plus some padding.
-    NUMBER_WIDTH = 24 + 1
-    # Number height
-    NUMBER_HEIGHT = 36
-    # Total number of digits.
-    DIGITS = 3
+    # Number of blended backgrounds for the fade between day and night, counting full day and full night.
+    BLEND_FRAMES = 16
 
     def __init__(self):
-        # Area to render the score on.
-        self.surface = pygame.Surface((Score.DIGITS * Score.NUMBER_WIDTH, Score.NUMBER_HEIGHT), pygame.SRCALPHA)
-        # The score.
-        self.score_count = 0
+        super(Background, self).__init__()
 
-    def draw(self, gamescreen):
-        """
-        Draw the current score on the game screen.
+        self.day_background = assets.get("background", alpha=False)
+        self.night_background = assets.get("night_background", alpha=False)
 
-        :param gamescreen: The game screen to draw on.
-        """
-        score_string = str(self.score_count)
-        self.surface.fill(0)
-
-        # Draw each digit.
-        digit_count = 0
-        for d in score_string:
-            self.surface.blit(Score.NUMBERS[int(d)], (digit_count * Score.NUMBER_WIDTH, 0))
-            digit_count += 1
+        # Opaque blends of day over night by blend step, made the first time each one is needed.
+        self.blends = {0: self.night_background, Background.BLEND_FRAMES - 1: self.day_background}
 
-        gamescreen.blit(self.surface, (SCREENWIDTH - self.surface.get_width(), 5))
-
-    def score(self):
+    def get_blend_step(self, day_weight=None):
         """
-        Increment the score.
+        Get how far between night and day the background is.
 
-        :return: The updated score.
+        :param day_weight: How much of the day is showing, defaults to the current background.
+        :return: 0 for full night up to BLEND_FRAMES - 1 for full day.
         """
-        self.score_count += 1
-        return self.score_count
-
-
-class Background:
-    """
-    Keeps track of the background image and switches them accordingly.
-    """
-
-    # Length of  a day or night in frames
-    DAY_NIGHT_LENGTH = 120
+        if day_weight is None:
+            day_weight = self.get_day_weight()
 
-    # Dawn/dusk transition frames, for a smooth transition this should be a multiple of 255 (or close to it)
-    # for a smooth transition.
-    TRANSITION_TIME = 51
-
-    def __init__(self):
+        return int(round(day_weight * (Background.BLEND_FRAMES - 1)))
 
-        self.day_background = pygame.image.load("resources/images/background.png").convert()
-        self.night_background = pygame.image.load("resources/images/night_background.png").convert()
-
-        self.count = 0
-        self.day = True
-        self.day_alpha = 255
-        self.night_alpha = 0
-
-    def update(self):
+    def blend(self, step):
         """
-        Update the background.
+        Blend the day background over the night background.
+
+        :param step: Blend step, see get_blend_step().
+        :return: A new opaque background.
         """
-        # transition form day to night, or vice versa.
-        if self.count == Background.DAY_NIGHT_LENGTH:
-            self.day = not self.day
-            self.count = 0
-        # Else check for if we are in a transition
-        else:
-            # If we are in a transition smoothly change the alpha accordingly.
-            if (Background.DAY_NIGHT_LENGTH - Background.TRANSITION_TIME) <= self.count <= Background.DAY_NIGHT_LENGTH:
-                if self.day:
-                    self.day_alpha -= 255 / Background.TRANSITION_TIME
-                    self.night_alpha = 255
-                else:
-                    self.night_alpha -= 255 / Background.TRANSITION_TIME
-                    self.day_alpha = 255
-
-        # Increment the time and update the alphas accordingly.
-        self.count += 1
-        self.day_background.set_alpha(self.day_alpha)
-        self.night_background.set_alpha(self.night_alpha)
+        image = self.night_background.copy()
+        self.day_background.set_alpha(int(round(255.0 * step / (Background.BLEND_FRAMES - 1))))
+        image.blit(self.day_background, (0, 0))
+        self.day_background.set_alpha(None)
+        return image
 
-    def draw(self, gamescreen):
+    def draw(self, gamescreen, day_weight=None):
         """
-        Draw the backgrounds on the gamescreen.
+        Draw the background on the gamescreen, one opaque blit even during the transition between day and night.
 
-        If it is during the day, draw the day on top, then during transition it will fade out. The opposite happens
-        at night.
         :param gamescreen:
+        :param day_weight: How much of the day is showing, defaults to the current background.
         """
-        if self.day:
-            gamescreen.blit(self.night_background, (0, 0))
-            gamescreen.blit(self.day_background, (0, 0))
-        else:
-            gamescreen.blit(self.day_background, (0, 0))
-            gamescreen.blit(self.night_background, (0, 0))
+        step = self.get_blend_step(day_weight)
+        image = self.blends.get(step)
+        if image is None:
+            image = self.blend(step)
+            self.blends[step] = image
 
+        gamescreen.blit(image, (0, 0))
 
 
-class Fireball:
+class Game(engine.Game):
     """
-    A Fireball the bird can launch.
+    The game, drawn with pygame.
     """
-    FIREBALL_IMAGE = pygame.image.load("resources/images/fireball.png").convert_alpha()
-    WIDTH = 50
-    HEIGHT = 15
-
-    def __init__(self, start_x, start_y):
-        self.x = start_x + 16
-        self.y = start_y
-        self.surface = pygame.Surface((Fireball.WIDTH, Fireball.HEIGHT), pygame.SRCALPHA)
 
-    def update(self):
-        self.x += 5
+    BIRD_CLASS = Bird
+    PIPES_CLASS = Pipes
+    BACKGROUND_CLASS = Background
 
-    def draw(self, gamescreen):
-        self.surface.blit(Fireball.FIREBALL_IMAGE, (0, 0))
-        gamescreen.blit(self.surface, (self.x, self.y))
-
-    def is_visible(self):
-        """
-        Is the pipe pair still visible.
-        :return: True if the pipes has moved past 0, i.e. off screen
-        """
-        return self.x < SCREENWIDTH
+    def reset(self):
+        log.info("reset", score=self.bird.score.score_count, frames=self.frames)
+        super(Game, self).reset()
 
-    def get_rect(self):
-        """
-        Get the screen rectangle around the fireball.
-        :return: Rectangle with game screen position.
-        """
-        return self.surface.get_bounding_rect().move(self.x, self.y)
+    def check_crash(self):
+        game_over = self.game_over
+        super(Game, self).check_crash()
+        if self.game_over and not game_over:
+            log.info("game over", score=self.bird.score.score_count, frames=self.frames, cause=self.crash_cause)
 
 
 """
 Game Control
 
 """
-# Create a bird
-bird = Bird(SCREENWIDTH/2, SCREENHEIGHT/2)
-
-background = Background()
-
-# Keep track of how often to add pipes.
-pipe_counter = 0
-
-# List of pipes
-number_of_pipes = 0
-pipes_list = [Pipes(screen, number_of_pipes)]
+seed = random.randrange(1 << 32)
+game = Game(seed, START_PIPE)
+# The player's input, written to RECORDING_DIRECTORY when the game quits.
+recording = Recording(seed, start_pipe=START_PIPE)
+
+if TEXTURE_RENDERER:
+    size = pygame.display.get_desktop_sizes()[0] if DISPLAY_SIZE == (0, 0) else DISPLAY_SIZE
+    renderer = TextureRenderer(screen, size, FULLSCREEN, ACCELERATED)
+elif DISPLAY_SIZE is not None:
+    renderer = ScaledRenderer(screen, display, SCALE_FILTER, INTEGER_SCALE)
+elif DIRTY_RECTS:
+    renderer = DirtyRectRenderer(screen)
+else:
+    renderer = Renderer(screen)
+
+# Frame timings, t shows them on screen.
+profiler = Profiler()
+profiler.instrument(game, "update_bird", "bird update")
+profiler.instrument(game.background, "update", "background update")
+profiler.instrument(game, "update_pipes", "pipes update")
+profiler.instrument(game, "check_crash", "collisions")
+
+# The frame capture while v has it on.
+frame_capture = None
+# Simulation frame of the last snapshot drawn, a drawn frame is captured once for each simulation frame it shows so
+# captures play at FPS however fast the frames are drawn.
+drawn_frame = 0
+
+# The game thread when PIPELINE is on, input goes straight to it.
+simulation = None
+# (command, time) input waiting for the next update, and the times of the input applied in the last one.
+queued_input = []
+applied_input = []
 
 # The enemies.
-# enemies = Enemies(screen)
-
-game_counter = 0
+# enemies = Enemies(renderer)
 
 done = False
-game_over = False
-score = 0
-
-# Tracking pause and game over
-paused = False
-started = False
 
-background.draw(screen)
-pygame.display.flip()
+renderer.start(game.background)
+renderer.finish()
 
 # Initialize the joysticks.
 joystick_count = pygame.joystick.get_count()
@@ -594,44 +519,97 @@ def draw():
     # Tick the clock, clear the screen and draw everything.
     # clock.tick(FPS)
     # screen.fill(0)
-    background.draw(screen)
+    profiler.frame()
+    with profiler.phase("draw background"):
+        renderer.start(game.background)
 
     # Draw all the pipes
-    for p in pipes_list:
-        p.draw(screen)
+    with profiler.phase("draw pipes"):
+        for p in game.pipes_list:
+            p.draw(renderer)
 
     # Bird and score on top.
-    bird.draw(screen)
+    with profiler.phase("draw bird"):
+        game.bird.draw(renderer)
     # enemies.draw()
 
     # Update the bird and pipes if the game is not paused and not game over
-    if not started:
-        screen.blit(get_ready_image, (20, 100))
+    if not game.started:
+        renderer.blit(assets.get(GET_READY_IMAGE), (20, 100))
 
-    elif paused:
-        screen.blit(paused_image, (60, 200))
+    elif game.paused:
+        renderer.blit(assets.get(PAUSED_IMAGE), (60, 200))
 
-    elif game_over:
-        screen.blit(game_over_image, (60, 200))
+    elif game.game_over:
+        renderer.blit(assets.get(GAME_OVER_IMAGE), (60, 200))
 
-    pygame.display.flip()
+    profiler.draw(renderer)
+    capture_frame()
 
-    clock.tick(30)
+    with profiler.phase("flip"):
+        renderer.finish()
+    record_latency(applied_input)
 
+    with profiler.phase("tick"):
+        wait_for_frame(FPS)
 
-def update():
 
-    global game_over
-    global started
-    global pipes_list
-    global pipe_counter
-    global paused
-    global number_of_pipes
-    global done
+def draw_snapshot(snapshot):
+    """
+    Draw a snapshot of the game from the simulation thread.
+
+    :param snapshot: The pipeline.Snapshot to draw.
+    """
+    global drawn_frame
+
+    with profiler.phase("draw background"):
+        renderer.start(game.background, snapshot.day_weight)
+
+    with profiler.phase("draw pipes"):
+        for p in snapshot.pipes:
+            renderer.blit(p.image, (p.x, p.y))
+
+    with profiler.phase("draw bird"):
+        score = Score.get_surface(snapshot.score)
+        renderer.blit(score, (SCREENWIDTH - score.get_width(), 5))
+
+        renderer.blit(snapshot.bird_image, (snapshot.bird_x, snapshot.bird_y))
+
+        fireball_image = assets.get(Fireball.FIREBALL_IMAGE)
+        for f in snapshot.fireballs:
+            renderer.blit(fireball_image, (f.x, f.y))
+
+    if not snapshot.started:
+        renderer.blit(assets.get(GET_READY_IMAGE), (20, 100))
+
+    elif snapshot.paused:
+        renderer.blit(assets.get(PAUSED_IMAGE), (60, 200))
+
+    elif snapshot.game_over:
+        renderer.blit(assets.get(GAME_OVER_IMAGE), (60, 200))
 
+    profiler.draw(renderer)
+    capture_frame(snapshot.frame - drawn_frame)
+    drawn_frame = snapshot.frame
 
+    with profiler.phase("flip"):
+        renderer.finish()
+    record_latency(simulation.shown_inputs())
 
-    # Check for game events.
+
+def handle_events():
+    """
+    Check for game events.
+
+    pygame does not say when an event happened, so input is stamped with when it is taken off the queue. Taking it
+    off every INPUT_POLL_INTERVAL keeps the stamp close.
+
+    :return: List of (Game method name, time.perf_counter()) tuples for the player's input.
+    """
+    global done
+
+    commands = []
+    now = time.perf_counter()
     for event in pygame.event.get():
 
 
@@ -642,64 +620,188 @@ def update():
             done = True
         # Fly
         elif event.type == pygame.KEYUP and event.key == pygame.K_SPACE or event.type == pygame.JOYBUTTONDOWN:
-            started = True
-            bird.climb()
+            commands.append(("climb", now))
         # Pause
         elif event.type == pygame.KEYUP and event.key == pygame.K_p:
-            paused = not paused
+            commands.append(("pause", now))
         elif event.type == pygame.KEYUP and event.key == pygame.K_z:
-            bird.fire()
+            commands.append(("fire", now))
+        # Frame timings
+        elif event.type == pygame.KEYUP and event.key == pygame.K_t:
+            profiler.show = not profiler.show
+        # Capture the frames
+        elif event.type == pygame.KEYUP and event.key == pygame.K_v:
+            toggle_capture()
         # Reset
         elif event.type == pygame.KEYUP and event.key == pygame.K_r:
-            bird.reset()
-            pipe_counter = 0
-            number_of_pipes = 0
-            pipes_list = [Pipes(screen, number_of_pipes)]
-            paused = False
-            game_over = False
+            commands.append(("reset", now))
             # enemies.reset()
 
-        print(screen, "Number of joysticks: {}".format(joystick_count))
+        log.debug("input", type=pygame.event.event_name(event.type), **event.dict)
 
-    # Update everything
-    # Update the bird and pipes if the game is not paused and not game over
-    if not started:
-        bird.flap()
-    elif not paused and not game_over:
+    return commands
+
+
+def poll_input():
+    """
+    Take the input off the event queue and send it to the game thread, or queue it for the next update.
+    """
+    for command, stamp in handle_events():
+        if simulation is not None:
+            simulation.send(command, stamp)
+        else:
+            queued_input.append((command, stamp))
 
-        bird.update()
-        # enemies.update()
-        background.update()
-        # bird.killed_enemy(enemies)
 
-        # Update each pipe, removing ones that are no longer visible.
+def wait_for_frame(fps):
+    """
+    Wait until the next frame is due, checking for input while waiting. With the game in its own thread the wait
+    ends as soon as the game has applied input, so it is drawn straight away.
 
-        for p in pipes_list:
-            p.update()
-            if not p.is_visible():
-                pipes_list.remove(p)
+    :param fps: Frames a second.
+    """
+    global next_frame
+
+    next_frame += 1.0 / fps
+    while True:
+        poll_input()
+        delay = next_frame - time.perf_counter()
+        if delay <= 0:
+            break
+        if simulation is None:
+            time.sleep(min(delay, INPUT_POLL_INTERVAL))
+        elif simulation.input_published.wait(min(delay, INPUT_POLL_INTERVAL)):
+            # The frames after this one follow on from now.
+            next_frame = time.perf_counter()
+            break
+
+    # Running behind, start counting again from now instead of rushing to catch up.
+    if delay < -1.0 / fps:
+        next_frame = time.perf_counter()
+
+
+def record_latency(stamps):
+    """
+    Time input from when it happened to the flip of the first frame showing it.
+
+    :param stamps: Times of the input, time.perf_counter().
+    """
+    now = time.perf_counter()
+    for stamp in stamps:
+        profiler.record("input latency", now - stamp)
 
-        # Increment the pipe counter and add one if it is time to.
-        pipe_counter += 1
-        if pipe_counter > Pipes.ADD_INTERVAL:
-            pipes_list.append(Pipes(screen, number_of_pipes))
-            number_of_pipes += 1
-            pipe_counter = 0
 
-        # Update the score.
-        bird.scored(pipes_list)
+def update():
+    with profiler.phase("events"):
+        poll_input()
 
-    if bird.crashed(pipes_list):  # , enemies):
-        game_over = True
+    # The input is applied at the last moment before the update.
+    del applied_input[:]
+    for command, stamp in queued_input:
+        recording.record(command)
+        getattr(game, command)()
+        applied_input.append(stamp)
+    del queued_input[:]
+
+    # Update everything, the bird, background and pipes, then check for a crash.
+    game.update()
+    recording.frame()
+    # enemies.update()
+    # game.bird.killed_enemy(enemies)
+
+
+def toggle_capture(wait=False):
+    """
+    Start capturing the frames drawn, one for each game frame, or stop if already capturing.
+
+    :param wait: When stopping, wait for the captured frames to be written.
+    """
+    global frame_capture
+
+    if frame_capture is None:
+        frame_capture = capture.FrameCapture(capture.new_directory(CAPTURE_DIRECTORY), CAPTURE_FORMAT,
+                                             FPS, CAPTURE_EVERY)
+        log.info("capture started", directory=frame_capture.directory, format=CAPTURE_FORMAT)
+    else:
+        frame_capture.stop(wait)
+        log.info("capture stopped", directory=frame_capture.directory, frames=frame_capture.captured,
+                 dropped=frame_capture.dropped)
+        frame_capture = None
+
+
+def capture_frame(frames=1):
+    """
+    Hand the frame drawn to the capture if it is on.
+
+    :param frames: Number of game frames the drawn frame stands for, 0 if it shows no new game frame.
+    """
+    if frame_capture is not None and frames > 0:
+        with profiler.phase("capture"):
+            frame = renderer.get_frame()
+            for i in range(frames):
+                frame_capture.capture(frame)
+
+
+def save_recording():
+    """
+    Write the recording of this game to RECORDING_DIRECTORY, named by when it was played.
+    """
+    if not os.path.isdir(RECORDING_DIRECTORY):
+        os.makedirs(RECORDING_DIRECTORY)
+    path = os.path.join(RECORDING_DIRECTORY, time.strftime("%Y%m%d-%H%M%S") + ".rec")
+    recording.save(path)
+    log.info("recorded", path=path)
 
-    # clock.tick(30)
 
 """
 The game loop.
 """
 
-# Game loop flag
-while not done:
-    threading.Thread(target=draw()).start()
-    threading.Thread(target=update()).start()
-
+if __name__ == "__main__":
+    # Start logging.
+    log = Log(LOG_FILE, LOG_LEVEL)
+    log.start()
+    log.info("joysticks", count=joystick_count)
+
+    try:
+        if PIPELINE:
+            # The game runs in the simulation thread, this one handles input and draws.
+            simulation = Simulation(game, recording=recording)
+            simulation.start()
+            try:
+                while not done:
+                    profiler.frame()
+                    with profiler.phase("events"):
+                        poll_input()
+                    draw_snapshot(simulation.latest())
+                    with profiler.phase("tick"):
+                        wait_for_frame(RENDER_FPS)
+            finally:
+                simulation.stop()
+                if RECORDING_DIRECTORY:
+                    save_recording()
+        else:
+            # Game loop flag
+            try:
+                while not done:
+                    draw()
+                    update()
+            finally:
+                if RECORDING_DIRECTORY:
+                    save_recording()
+
+        if PROFILE_FILE:
+            profiler.write(PROFILE_FILE)
+
+        if "input latency" in profiler.timings:
+            # Input to the flip showing it, as "from-to ms:count" per bucket.
+            log.info("input latency", inputs=len(profiler.timings["input latency"]), histogram=" ".join(
+                ("{:g}-{:g}ms:{}".format(start, end, count) if end is not None else "{:g}+ms:{}".format(start, count))
+                for start, end, count in profiler.histogram("input latency")))
+    except Exception as e:
+        log.error("crashed", error=repr(e))
+        raise
+    finally:
+        if frame_capture is not None:
+            toggle_capture(wait=True)
+        log.stop()
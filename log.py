@@ -0,0 +1,210 @@
+"""
+Logging that never makes a frame wait on the console or the disk.
+
+Each record goes in to a ring buffer and a background thread writes the buffer to a log file every FLUSH_INTERVAL
+seconds, starting a new file when it gets too big. When the buffer is full the oldest records are dropped, and
+events logged too often in one second are dropped and counted instead of written.
+
+    log = Log("flappybird.log")
+    log.start()
+    log.info("game over", score=3, cause="ground")
+    log.stop()
+
+Records are written one per line as the time, the level, the event then its fields as name=value.
+
+"""
+
+from collections import deque
+import os
+import sys
+import threading
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+
+class Log(threading.Thread):
+    """
+    Buffers records and writes them from its own thread.
+
+    The buffer is a deque, appending to it and popping from it are atomic so the game's threads and the writer never
+    take a lock.
+    """
+
+    # Records the buffer holds.
+    CAPACITY = 1024
+
+    # Seconds between writes.
+    FLUSH_INTERVAL = 0.5
+
+    # Size a log file grows to before a new one is started, and how many old ones to keep.
+    MAX_BYTES = 1024 * 1024
+    BACKUPS = 3
+
+    # Most records of one event to write in a second.
+    RATE_LIMIT = 20
+
+    def __init__(self, path=None, level=INFO, capacity=CAPACITY, max_bytes=MAX_BYTES, backups=BACKUPS,
+                 rate_limit=RATE_LIMIT, console=False):
+        """
+        Initialize the log, start() starts writing it.
+
+        :param path: Log file, None to only write to the console. With no file and no console records are ignored.
+        :param level: Records below this level are ignored.
+        :param capacity: Records the buffer holds.
+        :param max_bytes: Size a log file grows to before a new one is started.
+        :param backups: Number of old log files to keep.
+        :param rate_limit: Most records of one event to write in a second.
+        :param console: Also write records to standard error.
+        """
+        super(Log, self).__init__(name="log")
+        self.daemon = True
+
+        self.path = path
+        self.level = level
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rate_limit = rate_limit
+        self.console = console
+
+        self.buffer = deque(maxlen=capacity)
+        # Records dropped because the buffer was full.
+        self.dropped = 0
+        # [second, records, records dropped] by event. Threads logging the same event at once can only make the
+        # counts a little off.
+        self.rates = {}
+
+        self.stopped = threading.Event()
+        self.file = None
+
+    def log(self, level, event, **fields):
+        """
+        Log an event.
+
+        :param level: One of DEBUG, INFO, WARNING or ERROR.
+        :param event: What happened.
+        :param fields: Details to write with it.
+        """
+        if level < self.level or not (self.path or self.console):
+            return
+
+        now = time.time()
+        second = int(now)
+        rate = self.rates.get(event)
+        if rate is None or rate[0] != second:
+            if rate is not None and rate[2]:
+                self.append((now, WARNING, "rate limited", {"event": event, "dropped": rate[2]}))
+            rate = self.rates[event] = [second, 0, 0]
+        rate[1] += 1
+        if rate[1] > self.rate_limit:
+            rate[2] += 1
+            return
+
+        self.append((now, level, event, fields))
+
+    def append(self, record):
+        if len(self.buffer) == self.capacity:
+            self.dropped += 1
+        self.buffer.append(record)
+
+    def debug(self, event, **fields):
+        self.log(DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.log(ERROR, event, **fields)
+
+    @staticmethod
+    def format(record):
+        """
+        Format a record as a line.
+
+        :param record: (time, level, event, fields) tuple.
+        :return: The line, with its newline.
+        """
+        when, level, event, fields = record
+        line = "{}.{:03d} {:<7} {}".format(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(when)),
+                                           int(when * 1000) % 1000, LEVEL_NAMES.get(level, level), event)
+        for name in sorted(fields):
+            line += " {}={}".format(name, fields[name])
+        return line + "\n"
+
+    def run(self):
+        while not self.stopped.wait(Log.FLUSH_INTERVAL):
+            self.flush()
+        self.flush()
+
+    def stop(self):
+        """
+        Write what is left in the buffer and stop the writer.
+        """
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+        else:
+            self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def flush(self):
+        """
+        Write the buffered records, from the writer thread.
+        """
+        lines = []
+        while True:
+            try:
+                lines.append(Log.format(self.buffer.popleft()))
+            except IndexError:
+                break
+
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            lines.append(Log.format((time.time(), WARNING, "buffer full", {"dropped": dropped})))
+
+        if not lines:
+            return
+
+        text = "".join(lines)
+        if self.console:
+            sys.stderr.write(text)
+            sys.stderr.flush()
+        if self.path:
+            self.write(text)
+
+    def write(self, text):
+        """
+        Write to the log file, starting a new one first if it would grow past max_bytes.
+        """
+        if self.file is None:
+            self.file = open(self.path, "a")
+        if self.file.tell() and self.file.tell() + len(text) > self.max_bytes:
+            self.rotate()
+        self.file.write(text)
+        self.file.flush()
+
+    def rotate(self):
+        """
+        Move the log file to path.1, path.1 to path.2 and so on, dropping the oldest, and start a new one.
+        """
+        self.file.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = "{}.{}".format(self.path, i)
+            if os.path.exists(older):
+                os.replace(older, "{}.{}".format(self.path, i + 1))
+        if self.backups > 0:
+            os.replace(self.path, self.path + ".1")
+        else:
+            os.remove(self.path)
+        self.file = open(self.path, "a")
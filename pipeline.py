@@ -0,0 +1,247 @@
+"""
+Run the game in its own thread at a fixed rate and hand snapshots of it to the thread drawing it.
+
+The game objects are only ever touched by the simulation thread. Player input is sent to it as Game method names
+and each frame it publishes an immutable Snapshot of what is on screen. The drawing thread picks up the newest two
+snapshots and draws in between them, so a slow draw never slows the game down and a fast display gets smooth
+movement.
+
+"""
+
+from collections import namedtuple
+import queue
+import threading
+import time
+
+from engine import FPS
+
+# Everything needed to draw a frame. Nothing in it is touched by the simulation again, the images are shared
+# artwork that never changes.
+# course is the seed of the course, which changes on reset.
+# frame is the number of updates the simulation had made, inputs are the times of the player's input applied in it.
+Snapshot = namedtuple("Snapshot", "time started paused game_over day_weight course bird_image bird_x bird_y score "
+                                  "pipes fireballs frame inputs")
+# A pipe, told apart by its number in the course and Pipe.TOP or Pipe.BOTTOM, its artwork and where it was.
+PipeSnapshot = namedtuple("PipeSnapshot", "number position image x y")
+# Where a fireball was, fireballs are reused so the launch number tells them apart.
+FireballSnapshot = namedtuple("FireballSnapshot", "number x y")
+
+
+def take_snapshot(game, now, frame=0, inputs=()):
+    """
+    Take a snapshot of the game.
+
+    :param game: The game.
+    :param now: The time of the snapshot.
+    :param frame: Number of updates the simulation has made.
+    :param inputs: Times of the player's input applied in this frame.
+    :return: The Snapshot.
+    """
+    bird = game.bird
+    pipes = []
+    for p in game.pipes_list:
+        for pipe in (p.top_pipe, p.bottom_pipe):
+            pipes.append(PipeSnapshot(p.number, pipe.position, pipe.get_image(), pipe.x, pipe.y))
+
+    return Snapshot(now, game.started, game.paused, game.game_over, game.background.get_day_weight(),
+                    game.course.seed, bird.get_image(), bird.x, bird.y, bird.score.score_count, tuple(pipes),
+                    tuple(FireballSnapshot(f.number, f.x, f.y) for f in bird.fireballs), frame, tuple(inputs))
+
+
+def interpolate(previous, current, alpha):
+    """
+    Move a snapshot part of the way back towards the previous one.
+
+    :param previous: The previous snapshot.
+    :param current: The current snapshot.
+    :param alpha: 0 for the previous snapshot's positions up to 1 for the current ones.
+    :return: A snapshot with positions in between.
+    """
+    if previous is None or previous is current or alpha >= 1 or previous.course != current.course:
+        return current
+
+    def between(a, b):
+        return a + (b - a) * alpha
+
+    # Things that appeared since the previous snapshot are drawn where they are now.
+    previous_pipes = dict(((p.number, p.position), p) for p in previous.pipes)
+    pipes = []
+    for p in current.pipes:
+        before = previous_pipes.get((p.number, p.position), p)
+        pipes.append(p._replace(x=between(before.x, p.x), y=between(before.y, p.y)))
+
+    previous_fireballs = dict((f.number, f) for f in previous.fireballs)
+    fireballs = []
+    for f in current.fireballs:
+        before = previous_fireballs.get(f.number, f)
+        fireballs.append(FireballSnapshot(f.number, between(before.x, f.x), between(before.y, f.y)))
+
+    return current._replace(bird_x=between(previous.bird_x, current.bird_x),
+                            bird_y=between(previous.bird_y, current.bird_y),
+                            pipes=tuple(pipes), fireballs=tuple(fireballs))
+
+
+class Simulation(threading.Thread):
+    """
+    Updates the game FPS times a second in its own thread.
+    """
+
+    # Snapshots waiting to be drawn, the oldest is dropped when the drawing falls behind.
+    SNAPSHOTS = 4
+
+    # If the simulation falls this many frames behind it gives up catching up.
+    MAX_CATCH_UP = 5
+
+    def __init__(self, game, fps=FPS, recording=None):
+        """
+        Initialize the simulation, start() runs it.
+
+        :param game: The game to run, only this thread touches it once started.
+        :param fps: Game updates per second.
+        :param recording: replay.Recording to record the input in, only touched by this thread until stopped.
+        """
+        super(Simulation, self).__init__(name="simulation")
+        self.daemon = True
+        self.game = game
+        self.recording = recording
+        self.frame_time = 1.0 / fps
+
+        self.commands = queue.Queue()
+        self.snapshots = queue.Queue(Simulation.SNAPSHOTS)
+        self.stopped = threading.Event()
+        # Set when a snapshot with the player's input is published, so it can be drawn without waiting for a frame.
+        self.input_published = threading.Event()
+        # What stopped the simulation if it failed.
+        self.error = None
+
+        # The two newest snapshots, only used by the drawing thread.
+        self.previous = self.current = take_snapshot(game, time.time())
+        # Times of the input in the snapshots handed to the drawing thread, see shown_inputs().
+        self.inputs = []
+
+    def send(self, command, stamp=None):
+        """
+        Send player input to the game.
+
+        :param command: Name of the Game method to call, e.g. "climb".
+        :param stamp: When the input happened, time.perf_counter(), to measure how long it takes to show.
+        """
+        self.commands.put((command, stamp))
+
+    def stop(self):
+        """
+        Stop the simulation and wait for it to finish, up to a frame.
+        """
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        try:
+            self.simulate()
+        except Exception as e:
+            # Handed to the drawing thread by latest(), the game must not carry on frozen.
+            self.error = e
+
+    def simulate(self):
+        next_frame = time.time()
+        frame = 0
+        # Input that cut the wait for the frame short.
+        arrived = None
+        while not self.stopped.is_set():
+            # Apply the player's input right before moving the game on a frame.
+            inputs = []
+            while True:
+                if arrived is not None:
+                    command, stamp = arrived
+                    arrived = None
+                else:
+                    try:
+                        command, stamp = self.commands.get_nowait()
+                    except queue.Empty:
+                        break
+                if self.recording is not None:
+                    self.recording.record(command)
+                getattr(self.game, command)()
+                if stamp is not None:
+                    inputs.append(stamp)
+
+            self.game.update()
+            if self.recording is not None:
+                self.recording.frame()
+            frame += 1
+            self.publish(take_snapshot(self.game, time.time(), frame, inputs))
+
+            next_frame += self.frame_time
+
+            # Input arriving while waiting for the next frame moves that frame forward to now. The frames after it
+            # keep to the schedule, so the game keeps its speed and is never more than a frame ahead.
+            ahead = next_frame - self.frame_time - time.time()
+            if ahead > 0:
+                self.stopped.wait(ahead)
+            delay = next_frame - time.time()
+            if delay > 0:
+                try:
+                    arrived = self.commands.get(timeout=delay)
+                except queue.Empty:
+                    pass
+            elif -delay > Simulation.MAX_CATCH_UP * self.frame_time:
+                next_frame = time.time()
+
+    def publish(self, snapshot):
+        """
+        Queue a snapshot for drawing, dropping the oldest if the queue is full. The input in a dropped snapshot is
+        moved to the new one so it is still measured.
+        """
+        while True:
+            try:
+                self.snapshots.put_nowait(snapshot)
+                if snapshot.inputs:
+                    self.input_published.set()
+                return
+            except queue.Full:
+                try:
+                    dropped = self.snapshots.get_nowait()
+                    if dropped.inputs:
+                        snapshot = snapshot._replace(inputs=dropped.inputs + snapshot.inputs)
+                except queue.Empty:
+                    pass
+
+    def latest(self, now=None):
+        """
+        Get the snapshot to draw now, from the drawing thread. If the simulation failed its exception is raised
+        here.
+
+        :param now: The time to draw for, defaults to the current time.
+        :return: A snapshot in between the two newest snapshots.
+        """
+        if self.error is not None:
+            raise self.error
+
+        self.input_published.clear()
+        while True:
+            try:
+                snapshot = self.snapshots.get_nowait()
+            except queue.Empty:
+                break
+            self.previous, self.current = self.current, snapshot
+            if snapshot.inputs:
+                self.inputs.extend(snapshot.inputs)
+                # Show the player's input straight away instead of easing in to it over a frame.
+                self.previous = snapshot
+
+        if now is None:
+            now = time.time()
+
+        # Drawing runs a frame behind the game so there is always a snapshot to move towards.
+        alpha = max(0.0, (now - self.current.time) / self.frame_time)
+        return interpolate(self.previous, self.current, alpha)
+
+    def shown_inputs(self):
+        """
+        Get the times of the input that has reached the drawing thread since the last call, from the drawing thread.
+
+        :return: List of times.
+        """
+        inputs, self.inputs = self.inputs, []
+        return inputs
@@ -0,0 +1,229 @@
+"""
+Times each part of a frame so we can see where the frame time goes.
+
+Each phase keeps the last WINDOW timings, from which the rolling percentiles are worked out. The timings can be shown
+on screen or written to a CSV or JSON file.
+
+"""
+
+from collections import OrderedDict, deque
+import csv
+import json
+import time
+
+import pygame
+
+
+class Phase:
+    """
+    Times a phase with a with statement.
+    """
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """
+    Keeps rolling timings of the phases of a frame.
+    """
+
+    # Number of timings to keep for each phase.
+    WINDOW = 300
+
+    # Percentiles to report.
+    PERCENTILES = (50, 95, 99)
+
+    # Frames between re-rendering the overlay.
+    OVERLAY_REFRESH = 15
+    OVERLAY_COLOR = (255, 255, 255)
+    OVERLAY_BACKGROUND = (0, 0, 0, 160)
+    OVERLAY_LINE_HEIGHT = 12
+
+    def __init__(self, window=WINDOW):
+        """
+        Initialize the profiler.
+
+        :param window: Number of timings to keep for each phase.
+        """
+        self.window = window
+        # Timings in seconds for each phase, in the order the phases were first seen.
+        self.timings = OrderedDict()
+        self.phases = {}
+        self.last_frame = None
+
+        # Whether the overlay is on screen.
+        self.show = False
+        self.overlay = None
+        self.overlay_age = 0
+        self.font = None
+
+    def phase(self, name):
+        """
+        Time a phase.
+
+            with profiler.phase("draw pipes"):
+                ...
+
+        :param name: Name of the phase.
+        :return: Context manager timing the phase.
+        """
+        p = self.phases.get(name)
+        if p is None:
+            p = self.phases[name] = Phase(self, name)
+        return p
+
+    def record(self, name, seconds):
+        """
+        Record a timing.
+
+        :param name: Name of the phase.
+        :param seconds: How long it took.
+        """
+        timings = self.timings.get(name)
+        if timings is None:
+            timings = self.timings[name] = deque(maxlen=self.window)
+        timings.append(seconds)
+
+    def frame(self):
+        """
+        Mark the start of a frame, the time since the last one is recorded as the "frame" phase.
+        """
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.record("frame", now - self.last_frame)
+        self.last_frame = now
+
+    def instrument(self, obj, method_name, name=None):
+        """
+        Time every call to a method of an object.
+
+        :param obj: The object.
+        :param method_name: Name of the method.
+        :param name: Name of the phase, defaults to the method name.
+        """
+        method = getattr(obj, method_name)
+        p = self.phase(name or method_name)
+
+        def timed(*args, **kwargs):
+            with p:
+                return method(*args, **kwargs)
+
+        setattr(obj, method_name, timed)
+
+    @staticmethod
+    def percentile(values, percent):
+        """
+        Nearest rank percentile.
+
+        :param values: Sorted values.
+        :param percent: Percentile, 0 to 100.
+        :return: The percentile value.
+        """
+        if not values:
+            return 0
+        rank = int(round(percent / 100.0 * (len(values) - 1)))
+        return values[rank]
+
+    def summary(self):
+        """
+        Get the rolling statistics for each phase.
+
+        :return: List of dictionaries with name, count, mean, the percentiles and max, times in milliseconds.
+        """
+        rows = []
+        for name, timings in list(self.timings.items()):
+            values = sorted(timings)
+            row = OrderedDict()
+            row["name"] = name
+            row["count"] = len(values)
+            row["mean"] = 1000 * sum(values) / max(len(values), 1)
+            for percent in Profiler.PERCENTILES:
+                row["p{}".format(percent)] = 1000 * self.percentile(values, percent)
+            row["max"] = 1000 * values[-1] if values else 0
+            rows.append(row)
+        return rows
+
+    def histogram(self, name, bucket=0.008, buckets=8):
+        """
+        Count the timings of a phase in buckets.
+
+        :param name: Name of the phase.
+        :param bucket: Width of a bucket in seconds.
+        :param buckets: Number of buckets, the last one also counts everything longer.
+        :return: List of (from, to, count) tuples, times in milliseconds, to is None for the last bucket.
+        """
+        counts = [0] * buckets
+        for seconds in self.timings.get(name, ()):
+            counts[min(int(seconds / bucket), buckets - 1)] += 1
+
+        rows = []
+        for i, count in enumerate(counts):
+            to = 1000 * bucket * (i + 1) if i < buckets - 1 else None
+            rows.append((1000 * bucket * i, to, count))
+        return rows
+
+    def write(self, path):
+        """
+        Write the statistics to a file, JSON if the path ends with .json, otherwise CSV. JSON also includes the
+        timings themselves.
+
+        :param path: File to write.
+        """
+        rows = self.summary()
+        if path.endswith(".json"):
+            timings = dict((name, [1000 * t for t in values]) for name, values in list(self.timings.items()))
+            with open(path, "w") as f:
+                json.dump({"summary": rows, "timings": timings}, f, indent=2)
+        else:
+            with open(path, "w") as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ["name"])
+                writer.writeheader()
+                writer.writerows(rows)
+
+    def draw(self, gamescreen):
+        """
+        Draw the overlay on the game screen if it is showing.
+
+        :param gamescreen: The game screen.
+        """
+        if not self.show:
+            return
+
+        self.overlay_age += 1
+        if self.overlay is None or self.overlay_age >= Profiler.OVERLAY_REFRESH:
+            self.overlay = self.render_overlay()
+            self.overlay_age = 0
+
+        gamescreen.blit(self.overlay, (0, 0))
+
+    def render_overlay(self):
+        """
+        Render the statistics in to a surface.
+
+        :return: The overlay surface.
+        """
+        if self.font is None:
+            self.font = pygame.font.Font(None, 14)
+
+        lines = ["{:<16}{:>6}{:>6}{:>6}".format("ms", "p50", "p95", "p99")]
+        for row in self.summary():
+            lines.append("{:<16}{:>6.2f}{:>6.2f}{:>6.2f}".format(row["name"][:15], row["p50"], row["p95"], row["p99"]))
+
+        rendered = [self.font.render(line, True, Profiler.OVERLAY_COLOR) for line in lines]
+        width = max(r.get_width() for r in rendered) + 4
+        overlay = pygame.Surface((width, len(rendered) * Profiler.OVERLAY_LINE_HEIGHT + 4), pygame.SRCALPHA)
+        overlay.fill(Profiler.OVERLAY_BACKGROUND)
+        for i, r in enumerate(rendered):
+            overlay.blit(r, (2, 2 + i * Profiler.OVERLAY_LINE_HEIGHT))
+        return overlay
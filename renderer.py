@@ -0,0 +1,304 @@
+"""
+Renderers push each frame from the game screen to the display.
+
+The game objects draw themselves with blit() on a renderer the same way they would on a surface, so they draw the
+same way whether the renderer blits surfaces or draws textures.
+
+"""
+
+import weakref
+
+import pygame
+
+try:
+    from pygame._sdl2 import video
+except ImportError:
+    # Textures need pygame 2.
+    video = None
+
+
+class Renderer:
+    """
+    Draws on the game screen and pushes the whole screen to the display every frame.
+    """
+
+    def __init__(self, screen):
+        """
+        Initialize the renderer.
+
+        :param screen: The game screen.
+        """
+        self.screen = screen
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """
+        Draw a surface on the game screen.
+
+        :return: The area of the screen drawn on.
+        """
+        return self.screen.blit(source, dest, area, special_flags)
+
+    def get_width(self):
+        return self.screen.get_width()
+
+    def get_height(self):
+        return self.screen.get_height()
+
+    def get_size(self):
+        return self.screen.get_size()
+
+    def get_frame(self):
+        """
+        :return: Surface with the frame drawn so far, at the game's resolution.
+        """
+        return self.screen
+
+    def start(self, background, day_weight=None):
+        """
+        Start a frame by drawing the background.
+
+        :param background: The background.
+        :param day_weight: How much of the day is showing, defaults to the current background.
+        """
+        background.draw(self.screen, day_weight)
+
+    def finish(self):
+        """
+        Push the frame to the display.
+        """
+        pygame.display.flip()
+
+
+class DirtyRectRenderer(Renderer):
+    """
+    Only pushes the parts of the screen that changed to the display.
+
+    Every blit is tracked, at the start of the next frame the background is put back over those areas only and the
+    display is updated with the areas drawn in both frames. The whole screen is only drawn when the background
+    moves to the next blend step of the day/night transition.
+    """
+
+    def __init__(self, screen):
+        super(DirtyRectRenderer, self).__init__(screen)
+
+        # A copy of the background to restore the screen from.
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background_state = None
+        self.full_redraw = True
+
+        # Areas drawn in the last frame and this frame.
+        self.previous_rects = []
+        self.rects = []
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        rect = self.screen.blit(source, dest, area, special_flags)
+        self.rects.append(rect)
+        return rect
+
+    def start(self, background, day_weight=None):
+        """
+        Start a frame by restoring the background where things were drawn in the last frame.
+
+        :param background: The background.
+        :param day_weight: How much of the day is showing, defaults to the current background.
+        """
+        step = background.get_blend_step(day_weight)
+        if step != self.background_state:
+            background.draw(self.background, day_weight)
+            self.background_state = step
+            self.full_redraw = True
+
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                self.screen.blit(self.background, rect, rect)
+
+    def finish(self):
+        """
+        Push the changed areas to the display.
+        """
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.previous_rects + self.rects)
+
+        self.previous_rects = self.rects
+        self.rects = []
+
+
+class ScaledRenderer(Renderer):
+    """
+    Draws at the game's resolution on an offscreen surface and scales the whole frame to the display once.
+
+    The frame is scaled straight in to the middle of the display. The rest of the display shows the background
+    scaled to cover it, which is only scaled again when the background moves to the next blend step.
+    """
+
+    NEAREST = "nearest"
+    SMOOTH = "smooth"
+
+    def __init__(self, screen, display, scale_filter=NEAREST, integer_scale=True):
+        """
+        Initialize the renderer.
+
+        :param screen: The offscreen game screen, at the game's resolution.
+        :param display: The display surface.
+        :param scale_filter: NEAREST for sharp pixels, SMOOTH to blend them.
+        :param integer_scale: Only scale by whole numbers so every pixel is the same size, when the display is big
+                              enough.
+        """
+        super(ScaledRenderer, self).__init__(screen)
+        self.display = display
+        self.smooth = scale_filter == ScaledRenderer.SMOOTH
+
+        width, height = screen.get_size()
+        display_width, display_height = display.get_size()
+        scale = min(float(display_width) / width, float(display_height) / height)
+        if integer_scale and scale >= 1:
+            scale = int(scale)
+        self.scale = scale
+        self.size = (int(width * scale), int(height * scale))
+
+        # Where the frame goes on the display, scaled straight in to it.
+        self.area = pygame.Rect((0, 0), self.size)
+        self.area.center = display.get_rect().center
+        self.target = display.subsurface(self.area)
+
+        # The blend step of the background around the frame, None until it is drawn.
+        self.border_step = None
+
+    def start(self, background, day_weight=None):
+        super(ScaledRenderer, self).start(background, day_weight)
+
+        if self.area.size != self.display.get_size():
+            step = background.get_blend_step(day_weight)
+            if step != self.border_step:
+                self.draw_border()
+                self.border_step = step
+
+    def draw_border(self):
+        """
+        Fill the display with the background on the game screen, scaled to cover it.
+        """
+        width, height = self.screen.get_size()
+        display_width, display_height = self.display.get_size()
+        scale = max(float(display_width) / width, float(display_height) / height)
+
+        # Only the middle of the background that shows on the display is scaled.
+        visible = pygame.Rect(0, 0, min(width, int(display_width / scale)), min(height, int(display_height / scale)))
+        visible.center = (width // 2, height // 2)
+        pygame.transform.smoothscale(self.screen.subsurface(visible), self.display.get_size(), self.display)
+
+    def finish(self):
+        """
+        Scale the frame to the display and push it.
+        """
+        if self.smooth:
+            pygame.transform.smoothscale(self.screen, self.size, self.target)
+        elif self.size == self.screen.get_size():
+            self.target.blit(self.screen, (0, 0))
+        else:
+            # Nearest neighbour, with a whole number scale every pixel becomes the same size square.
+            pygame.transform.scale(self.screen, self.size, self.target)
+        pygame.display.flip()
+
+
+class TextureRenderer(Renderer):
+    """
+    Draws with SDL's renderer, on the GPU when there is one.
+
+    Each surface drawn is uploaded as a texture the first time it is drawn and the texture is kept for as long as the
+    surface is around, so a surface must not change once it has been drawn. A subsurface, like a sprite from the
+    atlas, is drawn from its parent's texture.
+
+    The frame is drawn on a texture the size of the game and scaled to the window when it is pushed, so it can be
+    read back at the game's size whatever the size of the window.
+    """
+
+    def __init__(self, screen, size=None, fullscreen=False, accelerated=True, vsync=False, title="Flappy Bird"):
+        """
+        Initialize the renderer and open its window.
+
+        :param screen: Surface the size of the game, only its size is used.
+        :param size: Size of the window, the game is scaled to fit it. Defaults to the size of the game.
+        :param fullscreen: Fill the monitor.
+        :param accelerated: Draw on the GPU, False for SDL's software renderer.
+        :param vsync: Wait for the monitor's refresh when pushing a frame.
+        :param title: Window title.
+        """
+        if video is None:
+            raise RuntimeError("TextureRenderer needs pygame 2")
+
+        super(TextureRenderer, self).__init__(screen)
+        self.window = video.Window(title, size or screen.get_size(), fullscreen_desktop=fullscreen)
+        self.renderer = video.Renderer(self.window, accelerated=1 if accelerated else 0, vsync=vsync)
+        self.renderer.logical_size = screen.get_size()
+
+        # Textures by the surface they were made from.
+        self.textures = weakref.WeakKeyDictionary()
+
+        # Texture the frame is drawn on.
+        self.target = video.Texture(self.renderer, screen.get_size(), target=True)
+
+    def get_texture(self, surface):
+        """
+        Get the texture of a surface, it is made the first time the surface is drawn.
+
+        :param surface: The surface, not a subsurface.
+        :return: The texture.
+        """
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = self.textures[surface] = video.Texture.from_surface(self.renderer, surface)
+        return texture
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """
+        Draw a surface, special_flags are not supported.
+
+        :return: The area of the screen drawn on.
+        """
+        x, y = source.get_abs_offset()
+        rect = pygame.Rect(0, 0, source.get_width(), source.get_height())
+        if area is not None:
+            rect = rect.clip(area)
+        texture_rect = rect.move(x, y)
+
+        rect = pygame.Rect(dest[0], dest[1], rect.width, rect.height)
+        self.get_texture(source.get_abs_parent()).draw(texture_rect, rect)
+        return rect
+
+    def get_frame(self):
+        """
+        Read the frame back from the renderer, slow on a GPU.
+
+        :return: New surface the size of the game with the frame drawn so far.
+        """
+        # Reading the window would read it at the window's size in to a surface the game's size.
+        target = self.renderer.target
+        self.renderer.target = self.target
+        frame = self.renderer.to_surface()
+        self.renderer.target = target
+        return frame
+
+    def start(self, background, day_weight=None):
+        """
+        Start a frame by drawing the background.
+
+        :param background: The background.
+        :param day_weight: How much of the day is showing, defaults to the current background.
+        """
+        self.renderer.target = self.target
+        self.renderer.clear()
+        background.draw(self, day_weight)
+
+    def finish(self):
+        """
+        Push the frame to the window.
+        """
+        self.renderer.target = None
+        self.renderer.clear()
+        self.target.draw()
+        self.renderer.present()
@@ -0,0 +1,150 @@
+"""
+Record games and play them back.
+
+A recording is the seed of the game's pipe course, the pipe it started at and the player's input by frame, which is
+all it takes to play the exact same game again. The file is a header followed by one 5 byte entry per input:
+
+    magic, seed, start pipe, frames     "<6sQII"
+    frame, command                      "<IB"   repeated
+
+Play one back as fast as possible without a display, or drawn at the normal speed:
+
+    python replay.py recordings/game.rec
+    python replay.py recordings/game.rec --show
+
+"""
+
+import argparse
+import struct
+import time
+
+import engine
+
+# Start of a recording file, change the version when the layout changes.
+MAGIC = b"FBREC2"
+HEADER = struct.Struct("<6sQII")
+ENTRY = struct.Struct("<IB")
+
+# The Game methods that can be recorded, stored by their index.
+COMMANDS = ("climb", "fire", "pause", "reset")
+
+
+class Recording:
+    """
+    The seed and input of a game.
+    """
+
+    def __init__(self, seed, entries=None, frames=0, start_pipe=1):
+        """
+        Initialize the recording.
+
+        :param seed: Seed the game was made with.
+        :param entries: List of (frame, command index) tuples.
+        :param frames: Number of game updates recorded.
+        :param start_pipe: Pipe the game started at.
+        """
+        self.seed = seed
+        self.start_pipe = start_pipe
+        self.entries = entries if entries is not None else []
+        self.frames = frames
+
+    def record(self, command):
+        """
+        Record input, call before it is applied to the game.
+
+        :param command: Name of the Game method, one of COMMANDS.
+        """
+        self.entries.append((self.frames, COMMANDS.index(command)))
+
+    def frame(self):
+        """
+        Record a game update, call after each Game.update().
+        """
+        self.frames += 1
+
+    def save(self, path):
+        """
+        Write the recording to a file.
+
+        :param path: File to write.
+        """
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.seed, self.start_pipe, self.frames))
+            for entry in self.entries:
+                f.write(ENTRY.pack(*entry))
+
+    @staticmethod
+    def load(path):
+        """
+        Read a recording from a file.
+
+        :param path: File to read.
+        :return: The Recording.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+
+        magic, seed, start_pipe, frames = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("{} is not a recording".format(path))
+        entries = list(ENTRY.iter_unpack(data[HEADER.size:]))
+        return Recording(seed, entries, frames, start_pipe)
+
+
+def replay(recording, game=None, on_frame=None):
+    """
+    Play a recording back.
+
+    :param recording: The Recording.
+    :param game: Game made with the recording's seed and start pipe, defaults to a headless engine.Game.
+    :param on_frame: Called with the game after each update, e.g. to draw it.
+    :return: The game as it was at the end of the recording.
+    """
+    if game is None:
+        game = engine.Game(recording.seed, recording.start_pipe)
+
+    entries = recording.entries
+    next_entry = 0
+    for frame in range(recording.frames):
+        while next_entry < len(entries) and entries[next_entry][0] == frame:
+            getattr(game, COMMANDS[entries[next_entry][1]])()
+            next_entry += 1
+
+        game.update()
+        if on_frame is not None:
+            on_frame(game)
+
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play back a recorded flappy bird game.")
+    parser.add_argument("recording", help="recording file to play")
+    parser.add_argument("--show", action="store_true", help="draw the game at the normal speed")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.recording)
+
+    if args.show:
+        # Opens the display.
+        import flappybird
+        game = flappybird.game = flappybird.Game(recording.seed, recording.start_pipe)
+
+        def on_frame(game):
+            flappybird.draw()
+            # Only the recorded input is played.
+            del flappybird.queued_input[:]
+    else:
+        game = None
+        on_frame = None
+
+    start = time.perf_counter()
+    game = replay(recording, game, on_frame)
+    elapsed = time.perf_counter() - start
+
+    print("{} frames in {:.3f}s, score {}, {}".format(recording.frames, elapsed, game.bird.score.score_count,
+                                                      game.crash_cause or "no crash"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Play lots of seeded games on every core.
+
+Each game runs headless on the engine in a worker process and its result is handed back as soon as it finishes,
+so long sweeps can be watched while they run. The pipe settings can be changed per game to tune the difficulty.
+
+    python runner.py --games 10000 --set ADD_INTERVAL=150 --set MAX_PIPE_Y_MOVEMENT=80
+
+"""
+
+import argparse
+from collections import Counter
+import multiprocessing
+
+import engine
+
+# Longest game to play, in frames, a good policy could otherwise fly forever.
+MAX_FRAMES = 30 * 60 * 10
+
+# Pipes settings that can be changed for a game.
+SETTINGS = ("ADD_INTERVAL", "MIN_PIPE_Y_MOVEMENT", "MAX_PIPE_Y_MOVEMENT", "START_MOVING_Y_COUNT")
+
+
+def gap_policy(game):
+    """
+    Climb whenever the bird drops below the middle of the next pipe gap.
+
+    :param game: The game being played.
+    :return: True to climb.
+    """
+    bird = game.bird
+    for p in game.pipes_list:
+        if p.x + engine.Pipe.WIDTH >= bird.x:
+            top = p.top_pipe.get_rect()
+            gap_middle = (top.y + top.height + p.bottom_pipe.y) / 2
+            return bird.climbingcount == 0 and bird.y + bird.height / 2 > gap_middle
+    return bird.climbingcount == 0 and bird.y > engine.SCREENHEIGHT / 2
+
+
+def play(seed, policy=gap_policy, settings=None, max_frames=MAX_FRAMES, start_pipe=1):
+    """
+    Play one game to the end.
+
+    :param seed: Seed for the pipe course.
+    :param policy: Called with the game every frame, returns True to climb.
+    :param settings: Dictionary of Pipes settings to play with, see SETTINGS.
+    :param max_frames: Stop the game after this many frames.
+    :param start_pipe: Number of the first pipe in the course.
+    :return: Dictionary with the seed, settings, score, frames survived and crash cause.
+    """
+    settings = settings or {}
+    defaults = dict((name, getattr(engine.Pipes, name)) for name in settings)
+    for name, value in settings.items():
+        setattr(engine.Pipes, name, value)
+
+    try:
+        game = engine.Game(seed, start_pipe)
+        game.started = True
+        while not game.game_over and game.frames < max_frames:
+            if policy(game):
+                game.bird.climb()
+            game.update()
+    finally:
+        for name, value in defaults.items():
+            setattr(engine.Pipes, name, value)
+
+    return {
+        "seed": seed,
+        "settings": settings,
+        "score": game.bird.score.score_count,
+        "frames": game.frames,
+        "cause": game.crash_cause,
+    }
+
+
+def _play(job):
+    """
+    Unpack a job for the pool.
+    """
+    return play(*job)
+
+
+def run(seeds, policy=gap_policy, settings=None, max_frames=MAX_FRAMES, processes=None, chunksize=16, start_pipe=1):
+    """
+    Play a game for every seed and settings combination across a pool of processes.
+
+    :param seeds: Seeds to play.
+    :param policy: Module level function called with the game every frame, returns True to climb.
+    :param settings: A settings dictionary, or a list of them to sweep.
+    :param max_frames: Stop each game after this many frames.
+    :param processes: Number of worker processes, defaults to the number of cores.
+    :param chunksize: Games handed to a worker at a time.
+    :param start_pipe: Number of the first pipe in each course.
+    :return: Generator of result dictionaries from play(), in the order they finish.
+    """
+    if settings is None or isinstance(settings, dict):
+        settings = [settings]
+
+    jobs = ((seed, policy, s, max_frames, start_pipe) for s in settings for seed in seeds)
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for result in pool.imap_unordered(_play, jobs, chunksize):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+class Summary:
+    """
+    Running totals of game results.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.total_score = 0
+        self.best_score = 0
+        self.total_frames = 0
+        self.causes = Counter()
+
+    def add(self, result):
+        """
+        Add a result from play().
+        """
+        self.games += 1
+        self.total_score += result["score"]
+        self.best_score = max(self.best_score, result["score"])
+        self.total_frames += result["frames"]
+        self.causes[result["cause"]] += 1
+
+    def __str__(self):
+        games = max(self.games, 1)
+        causes = ", ".join("{}: {}".format(cause or "survived", count) for cause, count in self.causes.most_common())
+        return "{} games, mean score {:.2f}, best score {}, mean frames {:.1f} ({})".format(
+            self.games, self.total_score / games, self.best_score, self.total_frames / games, causes)
+
+
+def summarize(results):
+    """
+    Summarize results per settings.
+
+    :param results: Iterable of results from play().
+    :return: Dictionary of sorted settings items to Summary.
+    """
+    summaries = {}
+    for result in results:
+        key = tuple(sorted(result["settings"].items()))
+        summaries.setdefault(key, Summary()).add(result)
+    return summaries
+
+
+def _progress(results, every):
+    """
+    Pass results through, printing how many have been played every so often.
+    """
+    for count, result in enumerate(results, 1):
+        if count % every == 0:
+            print("{} games played".format(count))
+        yield result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play seeded flappy bird games on every core.")
+    parser.add_argument("--games", type=int, default=1000, help="games to play per settings")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes, defaults to every core")
+    parser.add_argument("--start-pipe", type=int, default=1, help="start each course at this pipe")
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES, help="longest game in frames")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE[,VALUE...]",
+                        help="Pipes setting to play with, several values are swept. One of " + ", ".join(SETTINGS))
+    parser.add_argument("--every", type=int, default=1000, help="print progress every this many games")
+    args = parser.parse_args()
+
+    sweep = [{}]
+    for option in args.set:
+        name, values = option.split("=")
+        if name not in SETTINGS:
+            parser.error("unknown setting " + name)
+        sweep = [dict(s, **{name: int(v)}) for s in sweep for v in values.split(",")]
+
+    seeds = range(args.seed, args.seed + args.games)
+    results = run(seeds, settings=sweep, max_frames=args.max_frames, processes=args.processes,
+                  start_pipe=args.start_pipe)
+    summaries = summarize(_progress(results, args.every))
+
+    for key, summary in sorted(summaries.items()):
+        print("{}: {}".format(dict(key) or "defaults", summary))
+
+
+if __name__ == "__main__":
+    main()
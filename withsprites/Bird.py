@@ -2,6 +2,8 @@
 
 import pygame
 
+import assets
+
 class Bird(pygame.sprite.Sprite):
     """
     Represents the Bird flying through the game.
@@ -18,8 +20,7 @@ class Bird(pygame.sprite.Sprite):
         self.width, self.height = 32, 32
 
         # The bird's image.
-        self.wing_up_image = pygame.image.load("resources/images/bird_wing_up.png").convert_alpha()
-        self.wing_down_image = pygame.image.load("resources/images/bird_wing_down.png").convert_alpha()
+        self.wing_up_image = assets.get("bird_wing_up")
+        self.wing_down_image = assets.get("bird_wing_down")
         self.wing_up = True
         self.image = self.wing_up_image
-        self.surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)